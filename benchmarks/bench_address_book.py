@@ -0,0 +1,196 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from datetime import date, timedelta
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "contacts_bot"))
+
+from address_book import AddressBook  # noqa: E402
+from bench_memory import make_name, per_million  # noqa: E402
+from models import Record  # noqa: E402
+from storage import Storage  # noqa: E402
+
+DEFAULT_SIZES = (10_000, 100_000)
+# Birthdays are spread uniformly over these years, so every day of the year
+# (Feb 29 included) has contacts.
+FIRST_BIRTHDAY = date(1950, 1, 1)
+LAST_BIRTHDAY = date(2009, 12, 31)
+# Fixed so get_upcoming_birthdays scans the same window on every run.
+BIRTHDAYS_FROM = date(2024, 6, 1)
+
+Row = Tuple[str, List[str], str]
+
+
+def generate(count: int, seed: int, first_index: int = 0) -> List[Row]:
+    rng = random.Random(seed)
+    span = (LAST_BIRTHDAY - FIRST_BIRTHDAY).days + 1
+    rows = []
+    for index in range(first_index, first_index + count):
+        phones = [f"{rng.randrange(10 ** 10):010d}" for _ in range(rng.randint(1, 3))]
+        birthday = FIRST_BIRTHDAY + timedelta(days=rng.randrange(span))
+        rows.append((make_name(index), phones, birthday.strftime("%d.%m.%Y")))
+    return rows
+
+
+def build(rows: Iterable[Row]) -> AddressBook:
+    book = AddressBook()
+    for name, phones, birthday in rows:
+        record = Record(name)
+        for phone in phones:
+            record.add_phone(phone)
+        record.add_birthday(birthday)
+        book.add_record(record)
+    return book
+
+
+def timed(operation: Callable[[], Any]) -> float:
+    started = perf_counter()
+    operation()
+    return perf_counter() - started
+
+
+def rate(count: int, seconds: float) -> Dict[str, float]:
+    return {"ops": count, "seconds": seconds, "ops_per_sec": count / seconds if seconds else 0.0}
+
+
+def measure_memory(rows: List[Row]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    book = build(rows)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del book
+    return (after - before) / len(rows)
+
+
+def measure_startup(rows: List[Row]) -> float:
+    # Time for a fresh process to open a compacted book and answer its first
+    # lookup, which is what a user waits for before the prompt is useful.
+    directory = tempfile.mkdtemp(prefix="bench_address_book_")
+    try:
+        storage = Storage(directory)
+        book = storage.load()
+        book.add_many(rows)
+        storage.compact()
+        storage.close()
+
+        started = perf_counter()
+        storage = Storage(directory)
+        book = storage.load()
+        book.find(rows[len(rows) // 2][0])
+        seconds = perf_counter() - started
+        storage.close()
+        return seconds
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_operations(book: AddressBook, rows: List[Row], operations: int, seed: int) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(seed)
+    count = min(operations, len(rows))
+    sample = rng.sample(rows, count)
+    names = [name for name, _, _ in sample]
+    new_rows = generate(count, seed + 1, first_index=len(rows))
+    results: Dict[str, Dict[str, float]] = {}
+
+    results["add_contact"] = rate(count, timed(
+        lambda: [book.add_contact(name, phones[0]) for name, phones, _ in new_rows]
+    ))
+    results["find"] = rate(count, timed(lambda: [book.find(name) for name in names]))
+    results["show_phone"] = rate(count, timed(lambda: [book.show_phone(name) for name in names]))
+    new_phones = [f"{rng.randrange(10 ** 10):010d}" for _ in range(count)]
+    results["change_contact"] = rate(count, timed(
+        lambda: [
+            book.change_contact(name, phones[0], new_phone)
+            for (name, phones, _), new_phone in zip(sample, new_phones)
+        ]
+    ))
+
+    listed = len(book)
+    results["show_all"] = rate(listed, timed(lambda: book.show_all()))
+    rounds = max(1, min(100, count // 100))
+    results["get_upcoming_birthdays"] = rate(rounds, timed(
+        lambda: [book.get_upcoming_birthdays(7, BIRTHDAYS_FROM) for _ in range(rounds)]
+    ))
+
+    results["delete"] = rate(count, timed(lambda: [book.delete(name) for name in names]))
+    return results
+
+
+def git_revision() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Throughput, memory and startup time of AddressBook operations")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+        help="book sizes to benchmark, e.g. 10000 100000 1000000 10000000",
+    )
+    parser.add_argument("--ops", type=int, default=10_000, help="operations timed per benchmark")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench_address_book.json", help="JSON file for the results")
+    parser.add_argument("--skip-memory", action="store_true", help="do not trace allocations (slow on big books)")
+    parser.add_argument("--skip-startup", action="store_true", help="do not time loading a saved book")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        rows = generate(size, args.seed)
+        result: Dict[str, Any] = {"size": size}
+        if not args.skip_memory:
+            result["bytes_per_record"] = measure_memory(rows)
+        if not args.skip_startup:
+            result["startup_seconds"] = measure_startup(rows)
+
+        started = perf_counter()
+        book = build(rows)
+        result["build_seconds"] = perf_counter() - started
+        result["operations"] = run_operations(book, rows, args.ops, args.seed)
+        results.append(result)
+        del book
+
+        print(f"size {size}: built in {result['build_seconds']:.2f}s", end="")
+        if "startup_seconds" in result:
+            print(f", startup {result['startup_seconds']:.3f}s", end="")
+        if "bytes_per_record" in result:
+            memory = result["bytes_per_record"]
+            print(f", {memory:.0f} bytes/record ({per_million(memory):.0f} MiB per 1M)", end="")
+        print()
+        for name, operation in result["operations"].items():
+            print(f"  {name:<24}{operation['ops_per_sec']:>14,.0f} ops/s")
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "ops": args.ops,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import os
+import sys
+import tracemalloc
+from typing import Callable, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "contacts_bot"))
+
+from models import Record  # noqa: E402
+
+
+class DictField:
+    def __init__(self, value: str) -> None:
+        self.value = value
+
+
+class DictRecord:
+    def __init__(self, name: str) -> None:
+        self.name = DictField(name)
+        self.phones: List[DictField] = []
+        self.birthday: Optional[DictField] = None
+        self._book = None
+
+    def add_phone(self, phone: str) -> None:
+        self.phones.append(DictField(phone))
+
+
+def make_name(index: int) -> str:
+    letters = []
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters.append(chr(ord("a") + rest))
+    return "".join(letters).capitalize()
+
+
+def measure(factory: Callable[[str], object], count: int, phones: int) -> float:
+    names = [make_name(i) for i in range(count)]
+    numbers = [f"{i:010d}" for i in range(phones)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = []
+    for name in names:
+        record = factory(name)
+        for phone in numbers:
+            record.add_phone(phone)
+        records.append(record)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def per_million(size: float) -> float:
+    return size * 1_000_000 / 2 ** 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memory used by Record objects")
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--phones", type=int, default=2)
+    args = parser.parse_args()
+
+    baseline = measure(DictRecord, args.records, args.phones)
+    current = measure(Record, args.records, args.phones)
+    print(f"records: {args.records}, phones per record: {args.phones}")
+    print(f"dict-based model: {baseline:8.1f} bytes/record, {per_million(baseline):8.1f} MiB per 1M records")
+    print(f"current model:    {current:8.1f} bytes/record, {per_million(current):8.1f} MiB per 1M records")
+    print(f"saving:           {baseline - current:8.1f} bytes/record, "
+          f"{per_million(baseline - current):8.1f} MiB per 1M records")
+
+
+if __name__ == "__main__":
+    main()
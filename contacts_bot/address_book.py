@@ -1,75 +1,560 @@
+import csv
+from calendar import isleap
+import itertools
+import json
+import threading
 from collections import UserDict
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
-from models import Record
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, List, Dict, Optional, Sequence, Set, Tuple, Union, TYPE_CHECKING
+from datetime import date, datetime, timedelta
+from congratulations import CongratulationCalendar
+from models import (
+    BIRTHDAY_ERROR, PHONE_ERROR, Birthday, Phone, Record, format_date, normalize_name, phone_to_int, phone_to_str,
+    try_parse_date, validate_names,
+)
+from name_index import SortedKeyList, TrigramIndex
+from rwlock import ReadWriteLock
+from snapshot import SnapshotView, row_to_record
+
+if TYPE_CHECKING:
+    from storage import Storage
+
+BirthdayKey = Tuple[int, int]
+LEAP_DAY: BirthdayKey = (2, 29)
+# Where Feb 29 birthdays are celebrated in non-leap years.
+LEAP_DAY_ON_FEB_28: BirthdayKey = (2, 28)
+LEAP_DAY_ON_MAR_1: BirthdayKey = (3, 1)
+# A year ahead covers every birthday; more would only repeat them.
+MAX_BIRTHDAY_WINDOW = 366
+ImportRow = Tuple[str, Union[str, Iterable[str], None], Optional[str]]
+# (line or row number, name, phone strings, birthday string) after parsing.
+PendingRow = Tuple[int, str, List[str], Optional[str]]
+
+
+@dataclass
+class ImportReport:
+    added: int = 0
+    updated: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    @property
+    def total(self) -> int:
+        return self.added + self.updated + self.failed
+
+    def __str__(self) -> str:
+        return f"Imported {self.total} rows: {self.added} added, {self.updated} updated, {self.failed} failed."
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    # Smallest string greater than every string starting with `prefix`.
+    if not prefix:
+        return "\U0010ffff"
+    return prefix[:-1] + chr(min(ord(prefix[-1]) + 1, 0x10FFFF))
+
+
+def _csv_row(row: List[str]) -> ImportRow:
+    name, phones, birthday = (row + ["", "", ""])[:3]
+    return name.strip(), phones, birthday.strip() or None
+
+
+def _jsonl_row(line: str) -> ImportRow:
+    item = json.loads(line)
+    if not isinstance(item, dict):
+        raise ValueError("Expected a JSON object")
+    return str(item.get("name", "")).strip(), item.get("phones"), item.get("birthday") or None
+
 
 class AddressBook(UserDict):
+    # Lookups and listings hold self._lock for reading, changes hold it for
+    # writing. Loading rows from the snapshot and building the lazy name
+    # indexes happen during reads, so they are serialized by _materialize,
+    # which is always taken after self._lock.
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self._lock = ReadWriteLock()
+        self._materialize = threading.RLock()
+        self._birthdays: Dict[BirthdayKey, Dict["Record", None]] = {}
+        self._phones: Dict[int, Dict["Record", None]] = {}
+        self._base: Optional["SnapshotView"] = None
+        self._base_taken: Set[int] = set()
+        self._names: Optional[SortedKeyList] = None
+        self._trigrams: Optional[TrigramIndex] = None
+        self.calendar = CongratulationCalendar()
+        self.leap_day_policy: BirthdayKey = LEAP_DAY_ON_FEB_28
+        self.storage: Optional["Storage"] = None
+        super().__init__(*args, **kwargs)
+
+    # Records are keyed by Name.key (NFKC + casefold) so "anna" and "Anna"
+    # are the same contact; every keyed operation normalizes its argument.
+    def __setitem__(self, name: str, record: "Record") -> None:
+        key = normalize_name(name)
+        with self._lock.write():
+            if key in self.data or self._pull(key) is not None:
+                self._unlink(self.data[key])
+            self.data[key] = record
+            self._link(record)
+
+    def __delitem__(self, name: str) -> None:
+        key = normalize_name(name)
+        with self._lock.write():
+            if key not in self.data and self._pull(key) is None:
+                raise KeyError(name)
+            self._unlink(self.data.pop(key))
+
+    # A single dict lookup is atomic, so hits skip the lock; only a miss,
+    # which may have to load the row from the snapshot, takes it.
+    def __getitem__(self, name: str) -> "Record":
+        key = normalize_name(name)
+        record = self.data.get(key)
+        if record is not None:
+            return record
+        with self._lock.read():
+            record = self.data.get(key)
+            if record is None:
+                record = self._pull(key)
+                if record is None:
+                    raise KeyError(name)
+            return record
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        key = normalize_name(name)
+        if key in self.data:
+            return True
+        with self._lock.read():
+            return key in self.data or self._base_index(key) is not None
+
+    def __len__(self) -> int:
+        with self._materialize:
+            if self._base is None:
+                return len(self.data)
+            return len(self.data) + self._base.count - len(self._base_taken)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock.read():
+            self._load_all()
+            return iter(list(self.data))
+
+    def attach_snapshot(self, snapshot: "SnapshotView") -> None:
+        self._base = snapshot
+        self._base_taken = set()
+
+    def _base_index(self, key: str) -> Optional[int]:
+        with self._materialize:
+            if self._base is None:
+                return None
+            index = self._base.lookup(key)
+            if index is None or index in self._base_taken:
+                return None
+            return index
+
+    def _pull(self, key: str) -> Optional["Record"]:
+        with self._materialize:
+            index = self._base_index(key)
+            if index is None:
+                return None
+            self._base_taken.add(index)
+            return self._adopt(row_to_record(self._base.row(index)))
+
+    def _load_all(self) -> None:
+        with self._materialize:
+            if self._base is None:
+                return
+            for row in self._base.rows(self._base_taken):
+                self._adopt(row_to_record(row))
+            self._base = None
+            self._base_taken = set()
+
+    def _adopt(self, record: "Record") -> "Record":
+        # Snapshot rows hold distinct keys and are only loaded once, so the
+        # record is new to the book.
+        self.data[record.name.key] = record
+        self._index(record)
+        return record
+
+    def _journal(self, op: str, *args: str) -> None:
+        if self.storage is not None:
+            self.storage.append(op, *args)
+
+    def _index(self, record: "Record") -> None:
+        record._book = self
+        for number in record.phone_numbers:
+            self._phones.setdefault(number, {})[record] = None
+        if record.birthday:
+            self._index_birthday(record, record.birthday.value)
+        if self._names is not None:
+            self._names.add(record.name.key)
+        if self._trigrams is not None:
+            self._trigrams.add(record.name.key)
+
+    def _link(self, record: "Record") -> None:
+        self._index(record)
+        self._journal(
+            "put",
+            record.name.value,
+            ";".join(map(phone_to_str, record.phone_numbers)),
+            format_date(record.birthday.value) if record.birthday else "",
+        )
+
+    def _unindex(self, record: "Record") -> None:
+        for number in record.phone_numbers:
+            self._unindex_phone(record, number)
+        if record.birthday:
+            self._unindex_birthday(record, record.birthday.value)
+        if self._names is not None:
+            self._names.discard(record.name.key)
+        if self._trigrams is not None:
+            self._trigrams.discard(record.name.key)
+        record._book = None
+
+    def _unlink(self, record: "Record") -> None:
+        self._unindex(record)
+        self._journal("delete", record.name.value)
+
+    def _index_birthday(self, record: "Record", birthday: date) -> None:
+        self._birthdays.setdefault((birthday.month, birthday.day), {})[record] = None
+
+    def _unindex_birthday(self, record: "Record", birthday: date) -> None:
+        key = (birthday.month, birthday.day)
+        bucket = self._birthdays.get(key)
+        if bucket is not None:
+            bucket.pop(record, None)
+            if not bucket:
+                del self._birthdays[key]
+
+    def _on_birthday_changed(self, record: "Record", old_birthday: Optional["Birthday"]) -> None:
+        if old_birthday:
+            self._unindex_birthday(record, old_birthday.value)
+        if record.birthday:
+            self._index_birthday(record, record.birthday.value)
+        if record.birthday:
+            self._journal("birthday", record.name.value, format_date(record.birthday.value))
+
+    def _unindex_phone(self, record: "Record", number: int) -> None:
+        owners = self._phones.get(number)
+        if owners is not None:
+            owners.pop(record, None)
+            if not owners:
+                del self._phones[number]
+
+    def _on_phone_added(self, record: "Record", number: int) -> None:
+        self._phones.setdefault(number, {})[record] = None
+        self._journal("phone", record.name.value, phone_to_str(number))
+
+    def _on_phone_removed(self, record: "Record", number: int) -> None:
+        if number not in record.phone_numbers:
+            self._unindex_phone(record, number)
+        self._journal("remove", record.name.value, phone_to_str(number))
+
+    def _on_phone_edited(self, record: "Record", old_number: int, new_number: int) -> None:
+        if old_number not in record.phone_numbers:
+            self._unindex_phone(record, old_number)
+        self._phones.setdefault(new_number, {})[record] = None
+        self._journal("edit", record.name.value, phone_to_str(old_number), phone_to_str(new_number))
+
     def add_record(self, record: "Record") -> None:
-        self.data[record.name.value] = record
+        self[record.name.key] = record
     
     def find(self, name: str) -> Optional["Record"]:
-        return self.data.get(name)
+        return self.get(name)
+
+    def _name_index(self) -> SortedKeyList:
+        with self._materialize:
+            if self._names is None:
+                self._load_all()
+                self._names = SortedKeyList(self.data)
+            return self._names
+
+    def _fuzzy_index(self) -> TrigramIndex:
+        with self._materialize:
+            if self._trigrams is None:
+                self._load_all()
+                self._trigrams = TrigramIndex(self.data)
+            return self._trigrams
+
+    def search(
+        self,
+        prefix: Optional[str] = None,
+        fuzzy: Optional[str] = None,
+        max_distance: int = 1,
+        limit: Optional[int] = 20,
+    ) -> List["Record"]:
+        if (prefix is None) == (fuzzy is None):
+            raise ValueError("Provide either a prefix or a fuzzy name to search for.")
+        with self._lock.read():
+            if prefix is not None:
+                names: Iterable[str] = self._name_index().prefixed(normalize_name(prefix))
+            else:
+                names = (name for _, name in self._fuzzy_index().search(normalize_name(fuzzy), max_distance))
+            return [self.data[name] for name in itertools.islice(names, limit)]
+
+    def find_by_phone(self, phone: str) -> List["Record"]:
+        number = phone_to_int(phone)
+        if number is None:
+            return []
+        with self._lock.read():
+            self._pull_phone(number)
+            return list(self._phones.get(number, ()))
 
     def delete(self, name: str) -> None:
-        if name in self.data:
-            del self.data[name]
-
-    def get_upcoming_birthdays(self) -> List[Dict[str, str]]:
-        today = datetime.now().date()
-        upcoming_birthdays = []
-        
-        for record in self.data.values():
-            if not record.birthday:
-                continue
+        with self._lock.write():
+            if name in self:
+                del self[name]
 
-            birthday = record.birthday.value            
-            this_year_birthday = birthday.replace(year=today.year)
+    def _pull_phone(self, number: int) -> None:
+        # Like _pull_birthdays, for the snapshot rows holding `number`.
+        with self._materialize:
+            if self._base is None:
+                return
+            for index in self._base.phone_rows(number):
+                if index not in self._base_taken:
+                    self._base_taken.add(index)
+                    self._adopt(row_to_record(self._base.row(index)))
 
-            if this_year_birthday < today:
-                this_year_birthday = this_year_birthday.replace(year=today.year + 1)
+    def _pull_birthdays(self, days: Iterable[BirthdayKey]) -> None:
+        # Materializes only the snapshot rows whose birthday falls on one of
+        # `days`, so the bucket index below sees them without a full load.
+        with self._materialize:
+            if self._base is None:
+                return
+            for index in self._base.birthday_rows(days):
+                if index not in self._base_taken:
+                    self._base_taken.add(index)
+                    self._adopt(row_to_record(self._base.row(index)))
 
-            if 0 <= (this_year_birthday - today).days <= 7:
-                congratulation_date = this_year_birthday
+    def get_upcoming_birthdays(self, days: int = 7, start: Optional[date] = None) -> List[Dict[str, str]]:
+        if not 0 <= days <= MAX_BIRTHDAY_WINDOW:
+            raise ValueError(f"Number of days must be between 0 and {MAX_BIRTHDAY_WINDOW}.")
+        if start is None:
+            start = datetime.now().date()
+        window = []
+        # A window of a year or more reaches some days twice; each birthday
+        # is listed on its first occurrence only.
+        seen: Set[BirthdayKey] = set()
+        for offset in range(days + 1):
+            day = start + timedelta(days=offset)
+            keys = [(day.month, day.day)]
+            if keys[0] == self.leap_day_policy and not isleap(day.year):
+                keys.append(LEAP_DAY)
+            keys = [key for key in keys if key not in seen]
+            seen.update(keys)
+            window.append((day, keys))
+        # One read lock for the whole scan, so the result is a consistent
+        # view of the book even while other threads change it.
+        with self._lock.read():
+            self._pull_birthdays({key for _, keys in window for key in keys})
+            upcoming_birthdays = []
 
-                if congratulation_date.weekday() == 5:  # Saturday
-                    congratulation_date += timedelta(days=2)
-                elif congratulation_date.weekday() == 6:  # Sunday
-                    congratulation_date += timedelta(days=1)
+            for day, keys in window:
+                buckets = [self._birthdays[key] for key in keys if key in self._birthdays]
+                if not buckets:
+                    continue
 
-                upcoming_birthdays.append({
-                    "name": record.name.value,
-                    "birthday": this_year_birthday.strftime("%d.%m.%Y"),
-                    "congratulation_date": congratulation_date.strftime("%d.%m.%Y")
-                })
+                birthday_str = day.strftime("%d.%m.%Y")
+                _, congratulation_str = self.calendar.lookup(day)
+                for bucket in buckets:
+                    # Copied: another reader may be loading snapshot rows
+                    # into this bucket at the same time.
+                    for record in list(bucket):
+                        upcoming_birthdays.append({
+                            "name": record.name.value,
+                            "birthday": birthday_str,
+                            "congratulation_date": congratulation_str
+                        })
                 
-        return upcoming_birthdays
+            return upcoming_birthdays
 
-    def add_contact(self, name: str, phone: Optional[str] = None) -> str:
+    def _import_row(self, name: str, numbers: List[int], birthday: Optional[date]) -> bool:
         record = self.find(name)
         if record is None:
-            record = Record(name)
-            self.add_record(record)
-            message = "Contact added."
-        else:
-            message = "Contact updated."
-        if phone:
-            record.add_phone(phone)
-        return message
+            # A row may list one number in two spellings; keep it once, as
+            # the merge below does.
+            self.add_record(Record.restore(name, dict.fromkeys(numbers), birthday))
+            return True
+        for number in numbers:
+            if number not in record.phone_numbers:
+                record.add_phone_number(number)
+        if birthday is not None:
+            record.set_birthday(Birthday.from_date(birthday))
+        return False
+
+    def _import_chunk(self, chunk: List[PendingRow], report: ImportReport) -> None:
+        # Names and phones are validated a column at a time; only rows that
+        # pass every check become Records. Each chunk is applied under one
+        # write lock, so readers get a turn between chunks of a long import.
+        valid_names, name_errors = validate_names([name for _, name, _, _ in chunk])
+        numbers = Phone.normalize_many(phone for _, _, phones, _ in chunk for phone in phones)
+        with self._lock.write():
+            self._apply_chunk(chunk, valid_names, name_errors, numbers, report)
+
+    def _apply_chunk(
+        self,
+        chunk: List[PendingRow],
+        valid_names: Sequence[bool],
+        name_errors: Dict[int, str],
+        numbers: List[Optional[int]],
+        report: ImportReport,
+    ) -> None:
+        position = 0
+        for index, (row_number, name, phones, birthday) in enumerate(chunk):
+            row_numbers = numbers[position:position + len(phones)]
+            position += len(phones)
+            if not valid_names[index]:
+                report.errors.append((row_number, name_errors[index]))
+                continue
+            if None in row_numbers:
+                report.errors.append((row_number, PHONE_ERROR))
+                continue
+            parsed_birthday = try_parse_date(birthday) if birthday else None
+            if birthday and parsed_birthday is None:
+                report.errors.append((row_number, BIRTHDAY_ERROR))
+                continue
+            if self._import_row(name, row_numbers, parsed_birthday):
+                report.added += 1
+            else:
+                report.updated += 1
+
+    def add_many(
+        self,
+        rows: Iterable[Any],
+        parse: Callable[[Any], ImportRow] = tuple,
+        chunk_size: int = 10_000,
+    ) -> ImportReport:
+        return self._add_numbered(enumerate(rows, start=1), parse, chunk_size)
+
+    def _add_numbered(
+        self,
+        rows: Iterable[Tuple[int, Any]],
+        parse: Callable[[Any], ImportRow],
+        chunk_size: int,
+    ) -> ImportReport:
+        report = ImportReport()
+        chunk: List[PendingRow] = []
+        for row_number, row in rows:
+            try:
+                name, phones, birthday = parse(row)
+                if isinstance(phones, str):
+                    phones = phones.split(";")
+                phones = [phone.strip() for phone in phones or () if phone.strip()]
+            except (ValueError, TypeError, AttributeError) as e:
+                report.errors.append((row_number, str(e)))
+                continue
+            chunk.append((row_number, name, phones, birthday))
+            if len(chunk) == chunk_size:
+                self._import_chunk(chunk, report)
+                chunk = []
+                if self.storage is not None:
+                    self.storage.flush()
+        if chunk:
+            self._import_chunk(chunk, report)
+        if self.storage is not None:
+            self.storage.flush()
+        report.errors.sort()
+        return report
+
+    # File imports skip blank lines and number errors by line in the file,
+    # so a reported line can be found in an editor.
+    def import_csv(self, path: str, chunk_size: int = 10_000) -> ImportReport:
+        with open(path, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            rows: Iterator[Tuple[int, List[str]]] = (
+                (reader.line_num, row) for row in reader if any(cell.strip() for cell in row)
+            )
+            first = next(rows, None)
+            if first is None:
+                return ImportReport()
+            if first[1][0].strip().lower() != "name":
+                rows = itertools.chain([first], rows)
+            return self._add_numbered(rows, _csv_row, chunk_size)
+
+    def import_jsonl(self, path: str, chunk_size: int = 10_000) -> ImportReport:
+        with open(path, encoding="utf-8") as file:
+            lines = ((number, line) for number, line in enumerate(file, start=1) if line.strip())
+            return self._add_numbered(lines, _jsonl_row, chunk_size)
+
+    def add_contact(self, name: str, phone: Optional[str] = None) -> str:
+        # Both checks run before the write lock is taken, so a bad phone number
+        # neither blocks readers nor leaves a new contact without it.
+        new_record = Record(name)
+        number = int(Phone(phone).value) if phone else None
+        with self._lock.write():
+            record = self.find(name)
+            if record is None:
+                record = new_record
+                self.add_record(record)
+                message = "Contact added."
+            else:
+                message = "Contact updated."
+            if number is not None:
+                record.add_phone_number(number)
+            return message
 
     def change_contact(self, name: str, old_phone: str, new_phone: str) -> str:
-        record = self.find(name)
-        if record is None:
-            raise KeyError('Contact not found.')
-        record.edit_phone(old_phone, new_phone)
-        return "Phone number updated."
+        with self._lock.write():
+            record = self.find(name)
+            if record is None:
+                raise KeyError('Contact not found.')
+            record.edit_phone(old_phone, new_phone)
+            return "Phone number updated."
 
     def show_phone(self, name: str) -> str:
-        record = self.find(name)
-        if record is None:
+        with self._lock.read():
+            record = self.find(name)
+            if record is None:
+                raise KeyError('Contact not found.')
+            return '; '.join(map(phone_to_str, record.phone_numbers))
+
+    def who(self, phone: str) -> str:
+        owners = self.find_by_phone(phone)
+        if not owners:
             raise KeyError('Contact not found.')
-        return '; '.join(phone.value for phone in record.phones)
+        return '\n'.join(str(record) for record in owners)
+
+    def iter_records(self) -> Iterator["Record"]:
+        # The set of records is fixed when this is called: later additions and
+        # deletions neither show up nor break the iteration. Snapshot rows are
+        # immutable, so the unread ones are only noted, not copied.
+        with self._lock.read(), self._materialize:
+            records = list(self.data.values())
+            base, taken = self._base, set(self._base_taken)
+        if base is None:
+            return iter(records)
+        return itertools.chain(records, map(row_to_record, base.rows(taken)))
+
+    def iter_sorted(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Iterator["Record"]:
+        # Records ordered by name key, from `start` through every name
+        # beginning with `end`; offset and limit page inside that range.
+        with self._lock.read():
+            names = self._name_index()
+            first = 0 if start is None else names.rank(normalize_name(start))
+            last = len(names) if end is None else names.rank(_prefix_upper_bound(normalize_name(end)))
+            first += offset
+            if limit is not None:
+                last = min(last, first + limit)
+            return iter([self.data[key] for key in names.islice(first, last)])
+
+    def rank(self, name: str) -> int:
+        with self._lock.read():
+            return self._name_index().rank(normalize_name(name))
+
+    def iter_all(self, offset: int = 0, limit: Optional[int] = None, ordered: bool = False) -> Iterator[str]:
+        if ordered:
+            return map(str, self.iter_sorted(offset=offset, limit=limit))
+        stop = None if limit is None else offset + limit
+        return map(str, itertools.islice(self.iter_records(), offset, stop))
 
     def show_all(self) -> str:
-        if not self.data:
-            return "No contacts available."
-        return '\n'.join(str(record) for record in self.data.values())
\ No newline at end of file
+        with self._lock.read():
+            if not len(self):
+                return "No contacts available."
+            return '\n'.join(self.iter_all())
\ No newline at end of file
@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from address_book import AddressBook
+from metrics import UNKNOWN_COMMAND, Metrics, timed_lines
+from utils import USAGE, Result, input_error
+from handlers import (
+    handle_hello,
+    handle_exit,
+    handle_add_contact,
+    handle_change_contact,
+    handle_show_phone,
+    handle_show_all,
+    handle_range,
+    handle_who,
+    handle_search,
+    handle_import,
+    handle_add_birthday,
+    handle_show_birthday,
+    handle_birthdays
+)
+
+Handler = Callable[[List[str], "AddressBook"], Result]
+
+
+@dataclass(frozen=True)
+class Command:
+    name: str
+    handler: Handler
+    help: str
+    args: Tuple[str, ...] = ()
+    optional_args: Tuple[str, ...] = ()
+    options: Tuple[str, ...] = ()
+    aliases: Tuple[str, ...] = ()
+    exits: bool = False
+
+    @property
+    def arity(self) -> Tuple[int, Optional[int]]:
+        # Options may take values, so commands with options have no upper bound.
+        if self.options:
+            return len(self.args), None
+        return len(self.args), len(self.args) + len(self.optional_args)
+
+    def accepts(self, args: List[str]) -> bool:
+        least, most = self.arity
+        return len(args) >= least and (most is None or len(args) <= most)
+
+    @property
+    def usage(self) -> str:
+        parts = [self.name]
+        parts += [f"<{arg}>" for arg in self.args]
+        parts += [f"[{arg}]" for arg in self.optional_args]
+        parts += [f"[{option}]" for option in self.options]
+        return " ".join(parts)
+
+
+class CommandRegistry:
+    def __init__(self, metrics: Optional[Metrics] = None) -> None:
+        self._commands: Dict[str, Command] = {}
+        self._ordered: List[Command] = []
+        self.metrics = metrics
+
+    def register(self, command: Command) -> Command:
+        for name in (command.name, *command.aliases):
+            if name in self._commands:
+                raise ValueError(f"Command '{name}' is already registered.")
+        for name in (command.name, *command.aliases):
+            self._commands[name] = command
+        self._ordered.append(command)
+        return command
+
+    def get(self, name: str) -> Optional[Command]:
+        return self._commands.get(name)
+
+    def __iter__(self) -> Iterator[Command]:
+        return iter(self._ordered)
+
+    def help(self) -> str:
+        width = max(len(command.usage) for command in self._ordered)
+        lines = ["Available commands:"]
+        for command in self._ordered:
+            aliases = f" (aliases: {', '.join(command.aliases)})" if command.aliases else ""
+            lines.append(f"  {command.usage.ljust(width)}  {command.help}{aliases}")
+        return "\n".join(lines)
+
+    def dispatch(self, name: str, args: List[str], book: "AddressBook") -> Result:
+        command = self._commands.get(name)
+        if command is None:
+            result = Result.error(USAGE, "Invalid command.")
+            if self.metrics is not None:
+                self.metrics.record(UNKNOWN_COMMAND, 0.0, result.code, False)
+            return result
+        if not command.accepts(args):
+            result = Result.error(USAGE, f"Usage: {command.usage}")
+            if self.metrics is not None:
+                self.metrics.record(command.name, 0.0, result.code, False)
+            return result
+        if self.metrics is None:
+            return command.handler(args, book)
+
+        started = perf_counter()
+        result = command.handler(args, book)
+        if result.lines is None:
+            self.metrics.record(command.name, perf_counter() - started, result.code, result.ok)
+        else:
+            metrics = self.metrics
+            result.lines = timed_lines(
+                result.lines,
+                lambda: metrics.record(command.name, perf_counter() - started, result.code, result.ok),
+            )
+        return result
+
+
+def build_registry() -> CommandRegistry:
+    registry = CommandRegistry(Metrics())
+    registry.register(Command("hello", handle_hello, "Greet the bot"))
+    registry.register(Command(
+        "add", handle_add_contact, "Add a contact or a phone to an existing contact",
+        args=("name", "phone"),
+    ))
+    registry.register(Command(
+        "change", handle_change_contact, "Replace a contact's phone number",
+        args=("name", "old phone", "new phone"),
+    ))
+    registry.register(Command("phone", handle_show_phone, "Show a contact's phone numbers", args=("name",)))
+    registry.register(Command("who", handle_who, "Find the contacts owning a phone number", args=("phone",)))
+    registry.register(Command(
+        "search", handle_search, "Find contacts whose name starts with <name>, or similar names with --fuzzy",
+        args=("name",), options=("--fuzzy",),
+    ))
+    registry.register(Command(
+        "import", handle_import, "Bulk import contacts from a CSV (name,phones,birthday) or JSONL file",
+        args=("file",),
+    ))
+    registry.register(Command(
+        "all", handle_show_all, "Show all contacts, optionally one page at a time",
+        options=("--sorted", "--page N", "--size K", "--limit N"),
+    ))
+    registry.register(Command(
+        "range", handle_range, "Show contacts alphabetically from one name through another",
+        args=("from", "to"), options=("--page N", "--size K", "--limit N"),
+    ))
+    registry.register(Command(
+        "add-birthday", handle_add_birthday, "Set a contact's birthday",
+        args=("name", "DD.MM.YYYY"),
+    ))
+    registry.register(Command("show-birthday", handle_show_birthday, "Show a contact's birthday", args=("name",)))
+    registry.register(Command(
+        "birthdays", handle_birthdays, "Show birthdays in the next 7 (or the given number of, up to 366) days",
+        optional_args=("days",),
+    ))
+    registry.register(Command(
+        "help", input_error(lambda args, book: registry.help()), "Show this help", aliases=("?",),
+    ))
+    registry.register(Command(
+        "stats", input_error(lambda args, book: registry.metrics.report()),
+        "Show per-command counts, errors and latency percentiles",
+    ))
+    registry.register(Command("exit", handle_exit, "Exit the bot", aliases=("close",), exits=True))
+    return registry
+
+
+COMMANDS = build_registry()
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Set, Tuple
+
+# How far past December 31 a shifted date may land, e.g. a weekend
+# followed by New Year holidays.
+SPILL_DAYS = 31
+
+CongratulationDay = Tuple[date, str]
+
+
+class CongratulationCalendar:
+    def __init__(self, holidays: Iterable[date] = (), recurring: Iterable[Tuple[int, int]] = ()) -> None:
+        self.holidays: Set[date] = set(holidays)
+        self.recurring: Set[Tuple[int, int]] = set(recurring)
+        self._tables: Dict[int, List[CongratulationDay]] = {}
+
+    def is_day_off(self, day: date) -> bool:
+        return day.weekday() >= 5 or day in self.holidays or (day.month, day.day) in self.recurring
+
+    def table(self, year: int) -> List[CongratulationDay]:
+        # Index i holds the congratulation date (and its DD.MM.YYYY form) for
+        # the (i + 1)-th day of `year`: the first working day on or after it.
+        table = self._tables.get(year)
+        if table is None:
+            first = date(year, 1, 1)
+            length = (date(year + 1, 1, 1) - first).days
+            table = [None] * (length + SPILL_DAYS)
+            working = None
+            for offset in range(length + SPILL_DAYS - 1, -1, -1):
+                day = first + timedelta(days=offset)
+                if not self.is_day_off(day) or working is None:
+                    working = (day, day.strftime("%d.%m.%Y"))
+                table[offset] = working
+            table = table[:length]
+            self._tables[year] = table
+        return table
+
+    def lookup(self, day: date) -> CongratulationDay:
+        return self.table(day.year)[day.toordinal() - date(day.year, 1, 1).toordinal()]
+
+
+def load_holidays(path: str) -> CongratulationCalendar:
+    # One holiday per line: DD.MM.YYYY for a single date or DD.MM for one
+    # that repeats every year; blank lines and '#' comments are ignored.
+    holidays: List[date] = []
+    recurring: List[Tuple[int, int]] = []
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            text = line.split("#", 1)[0].strip()
+            if not text:
+                continue
+            parts = text.split(".")
+            try:
+                if len(parts) == 3:
+                    holidays.append(date(int(parts[2]), int(parts[1]), int(parts[0])))
+                elif len(parts) == 2:
+                    date(2000, int(parts[1]), int(parts[0]))
+                    recurring.append((int(parts[1]), int(parts[0])))
+                else:
+                    raise ValueError
+            except ValueError:
+                raise ValueError(f"{path}:{number}: expected DD.MM.YYYY or DD.MM, got {text!r}")
+    return CongratulationCalendar(holidays, recurring)
@@ -1,37 +1,94 @@
-from typing import List
-from utils import input_error
-from address_book import AddressBook
+import itertools
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from utils import NOT_FOUND, USAGE, VALIDATION, Output, Result, input_error
+from address_book import MAX_BIRTHDAY_WINDOW, AddressBook
+from models import BIRTHDAY_ERROR, PHONE_ERROR, phone_to_int, try_parse_date, validate_names
+
+MAX_REPORTED_ERRORS = 10
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_BIRTHDAY_WINDOW = 7
+
+
+PAGING_OPTIONS = ("--page", "--size", "--limit")
+
+
+def parse_options(args: List[str], allowed: Iterable[str], flags: Iterable[str] = ()) -> Dict[str, int]:
+    options: Dict[str, int] = {}
+    tokens = iter(args)
+    for token in tokens:
+        if token in flags:
+            options[token] = 1
+            continue
+        if token not in allowed:
+            raise ValueError(f"Unknown option: {token}")
+        value = next(tokens, None)
+        if value is None or not value.isdecimal() or int(value) < 1:
+            raise ValueError(f"Option {token} expects a positive number.")
+        options[token] = int(value)
+    return options
+
 
 @input_error
-def handle_add_birthday(args: List[str], book: "AddressBook") -> str:
-    if len(args) != 2:
-        raise IndexError("Please provide contact name and birthday date.")
-    
+def handle_hello(args: List[str], book: "AddressBook") -> Output:
+    return "How can I help you?"
+
+
+@input_error
+def handle_exit(args: List[str], book: "AddressBook") -> Output:
+    return "Good bye!"
+
+
+def page_window(options: Dict[str, int]) -> Tuple[int, Optional[int]]:
+    if "--limit" in options and ("--page" in options or "--size" in options):
+        raise ValueError("Use either --limit or --page/--size.")
+
+    if "--limit" in options:
+        return 0, options["--limit"]
+    if "--page" in options or "--size" in options:
+        size = options.get("--size", DEFAULT_PAGE_SIZE)
+        return (options.get("--page", 1) - 1) * size, size
+    return 0, None
+
+
+def stream_or_message(lines: Iterator[str], empty_message: str) -> Union[str, Iterable[str]]:
+    first = next(lines, None)
+    if first is None:
+        return empty_message
+    return itertools.chain([first], lines)
+
+
+@input_error
+def handle_add_birthday(args: List[str], book: "AddressBook") -> Output:
     name, date = args
+    if try_parse_date(date) is None:
+        return Result.error(VALIDATION, BIRTHDAY_ERROR)
     record = book.find(name)
     if not record:
-        raise KeyError("Contact not found.")
+        return Result.error(NOT_FOUND, "Contact not found.")
     record.add_birthday(date)
     return "Birthday added"
 
 
 @input_error
-def handle_show_birthday(args: List[str], book: "AddressBook") -> str:
-    if len(args) != 1:
-        raise IndexError("Please provide contact name.")
-    
+def handle_show_birthday(args: List[str], book: "AddressBook") -> Output:
     name = args[0]
     record = book.find(name)
     if not record:
-        raise KeyError("Contact not found.")
+        return Result.error(NOT_FOUND, "Contact not found.")
     return record.show_birthday()
 
 
 @input_error
-def handle_birthdays(book: "AddressBook") -> str:
-    upcoming = book.get_upcoming_birthdays()
+def handle_birthdays(args: List[str], book: "AddressBook") -> Output:
+    if args and not args[0].isdecimal():
+        return Result.error(VALIDATION, "Number of days must be a non-negative number.")
+    
+    days = int(args[0]) if args else DEFAULT_BIRTHDAY_WINDOW
+    if days > MAX_BIRTHDAY_WINDOW:
+        return Result.error(VALIDATION, f"Number of days must be at most {MAX_BIRTHDAY_WINDOW}.")
+    upcoming = book.get_upcoming_birthdays(days)
     if not upcoming:
-        return "There are no birthdays in the next 7 days."
+        return f"There are no birthdays in the next {days} days."
     
     result = [
         f"{b['name']}: birthday on {b['birthday']}, celebrate on {b['congratulation_date']}"
@@ -41,32 +98,77 @@ def handle_birthdays(book: "AddressBook") -> str:
 
 
 @input_error
-def handle_add_contact(args: List[str], book: "AddressBook") -> str:
-    if len(args) != 2:
-        raise IndexError("Please provide contact name and phone number.")
-    
+def handle_add_contact(args: List[str], book: "AddressBook") -> Output:
     name, phone = args
+    valid, errors = validate_names([name])
+    if not valid[0]:
+        return Result.error(VALIDATION, errors[0])
+    if phone_to_int(phone) is None:
+        return Result.error(VALIDATION, PHONE_ERROR)
     return book.add_contact(name, phone)
 
 
 @input_error
-def handle_change_contact(args: List[str], book: "AddressBook") -> str:
-    if len(args) != 3:
-        raise IndexError("Please provide contact name, old phone number and new phone number.")
-    
+def handle_change_contact(args: List[str], book: "AddressBook") -> Output:
     name, old_phone, new_phone = args
+    if phone_to_int(new_phone) is None:
+        return Result.error(VALIDATION, PHONE_ERROR)
     return book.change_contact(name, old_phone, new_phone)
 
 
 @input_error
-def handle_show_phone(args: List[str], book: "AddressBook") -> str:
-    if len(args) != 1:
-        raise IndexError("Please provide contact name.")
-    
+def handle_show_phone(args: List[str], book: "AddressBook") -> Output:
     name = args[0]
     return book.show_phone(name)
 
 
 @input_error
-def handle_show_all(book: "AddressBook") -> str:
-    return book.show_all()
\ No newline at end of file
+def handle_who(args: List[str], book: "AddressBook") -> Output:
+    phone = args[0]
+    return book.who(phone)
+
+
+@input_error
+def handle_import(args: List[str], book: "AddressBook") -> Output:
+    path = args[0]
+    if path.lower().endswith((".jsonl", ".json")):
+        report = book.import_jsonl(path)
+    else:
+        report = book.import_csv(path)
+    lines = [str(report)]
+    lines += [f"Line {line}: {message}" for line, message in report.errors[:MAX_REPORTED_ERRORS]]
+    if report.failed > MAX_REPORTED_ERRORS:
+        lines.append(f"... and {report.failed - MAX_REPORTED_ERRORS} more errors")
+    return "\n".join(lines)
+
+
+@input_error
+def handle_search(args: List[str], book: "AddressBook") -> Output:
+    # --fuzzy may come before or after the name.
+    names = [arg for arg in args if arg != "--fuzzy"]
+    if len(names) != 1:
+        return Result.error(USAGE, "Please provide one name, optionally with --fuzzy.")
+    if len(names) < len(args):
+        records = book.search(fuzzy=names[0])
+    else:
+        records = book.search(prefix=names[0])
+
+    if not records:
+        return "No contacts found."
+    return "\n".join(str(record) for record in records)
+
+
+@input_error
+def handle_show_all(args: List[str], book: "AddressBook") -> Output:
+    options = parse_options(args, PAGING_OPTIONS, flags=("--sorted",))
+    offset, limit = page_window(options)
+    lines = book.iter_all(offset, limit, ordered="--sorted" in options)
+    return stream_or_message(lines, "No contacts available." if offset == 0 else "No contacts on this page.")
+
+
+@input_error
+def handle_range(args: List[str], book: "AddressBook") -> Output:
+    start, end = args[:2]
+    offset, limit = page_window(parse_options(args[2:], PAGING_OPTIONS))
+    lines = map(str, book.iter_sorted(start, end, offset, limit))
+    return stream_or_message(lines, "No contacts found.")
\ No newline at end of file
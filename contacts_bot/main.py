@@ -1,18 +1,52 @@
-from address_book import AddressBook
-from utils import parse_input
-from handlers import (
-    handle_add_contact,
-    handle_change_contact,
-    handle_show_phone,
-    handle_show_all,
-    handle_add_birthday,
-    handle_show_birthday,
-    handle_birthdays
-)
+import argparse
+import asyncio
+import os
+import sys
+from collections import Counter
+from typing import IO, Iterable
+from address_book import LEAP_DAY_ON_FEB_28, LEAP_DAY_ON_MAR_1, AddressBook
+from storage import Storage
+from commands import COMMANDS
+from congratulations import load_holidays
+from server import CommandServer, parse_address, serve
+from utils import ERROR_CODES, OK, parse_input, write_output
 
-def main() -> None:
-    book = AddressBook()
+LEAP_DAY_POLICIES = {"feb28": LEAP_DAY_ON_FEB_28, "mar1": LEAP_DAY_ON_MAR_1}
+DATA_DIR = os.environ.get("CONTACTS_BOT_DATA", "addressbook_data")
+
+
+def summarize(counts: "Counter[str]") -> str:
+    succeeded = counts[OK]
+    failed = sum(counts[code] for code in ERROR_CODES)
+    summary = f"Processed {succeeded + failed} commands: {succeeded} succeeded, {failed} failed"
+    if failed:
+        summary += " (" + ", ".join(f"{code}: {counts[code]}" for code in ERROR_CODES if counts[code]) + ")"
+    return summary + "."
+
+
+def run_batch(lines: Iterable[str], book: "AddressBook", out: IO[str]) -> "Counter[str]":
+    # Returns how many commands finished with each result code.
+    counts: "Counter[str]" = Counter()
+    for line in lines:
+        command, args = parse_input(line)
+        if not command:
+            continue
+
+        result = COMMANDS.dispatch(command, args, book)
+        write_output(result, out)
+        counts[result.code] += 1
+        if book.storage is not None:
+            book.storage.checkpoint()
+
+        entry = COMMANDS.get(command)
+        if entry is not None and entry.exits:
+            break
+    return counts
+
+
+def run_interactive(book: "AddressBook", storage: "Storage") -> "Counter[str]":
     print("Welcome to the assistant bot!")
+    counts: "Counter[str]" = Counter()
     
     while True:
         user_input = input("Enter a command: ")
@@ -22,27 +56,79 @@ def main() -> None:
             print("Please enter a command")
             continue
 
-        if command in ["close", "exit"]:
-            print("Good bye!")
-            break
-        elif command == "hello":
-            print("How can I help you?")
-        elif command == "add":
-            print(handle_add_contact(args, book))
-        elif command == "change":
-            print(handle_change_contact(args, book))
-        elif command == "phone":
-            print(handle_show_phone(args, book))
-        elif command == "all":
-            print(handle_show_all(book))
-        elif command == "add-birthday":
-            print(handle_add_birthday(args, book))
-        elif command == "show-birthday":
-            print(handle_show_birthday(args, book))
-        elif command == "birthdays":
-            print(handle_birthdays(book))
+        result = COMMANDS.dispatch(command, args, book)
+        write_output(result, sys.stdout)
+        counts[result.code] += 1
+        storage.flush()
+
+        entry = COMMANDS.get(command)
+        if entry is not None and entry.exits:
+            return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Assistant bot for managing contacts")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--batch", metavar="FILE",
+        help="run commands from FILE ('-' for stdin) without the interactive prompt",
+    )
+    mode.add_argument(
+        "--serve", metavar="ADDRESS",
+        help="serve commands to many clients over HOST:PORT or unix:PATH, one book shared by all",
+    )
+    parser.add_argument(
+        "--holidays", metavar="FILE",
+        help="holiday calendar (DD.MM.YYYY or DD.MM per line) on which congratulations are not sent",
+    )
+    parser.add_argument(
+        "--leap-day", choices=sorted(LEAP_DAY_POLICIES), default="feb28",
+        help="day on which Feb 29 birthdays are celebrated in non-leap years",
+    )
+    parser.add_argument(
+        "--metrics-file", metavar="FILE",
+        help="write per-command counts and latency percentiles to FILE as JSON on exit",
+    )
+    options = parser.parse_args()
+
+    calendar = None
+    if options.holidays is not None:
+        try:
+            calendar = load_holidays(options.holidays)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    if options.serve is not None:
+        try:
+            parse_address(options.serve)
+        except ValueError as e:
+            parser.error(str(e))
+
+    storage = Storage(DATA_DIR)
+    book = storage.load()
+    if calendar is not None:
+        book.calendar = calendar
+    book.leap_day_policy = LEAP_DAY_POLICIES[options.leap_day]
+    try:
+        if options.serve is not None:
+            server = CommandServer(book, storage)
+            try:
+                asyncio.run(serve(server, options.serve))
+            except KeyboardInterrupt:
+                pass
+            counts = server.counts
+        elif options.batch is None:
+            counts = run_interactive(book, storage)
+        elif options.batch == "-":
+            counts = run_batch(sys.stdin, book, sys.stdout)
         else:
-            print("Invalid command.")
+            with open(options.batch, encoding="utf-8") as file:
+                counts = run_batch(file, book, sys.stdout)
+        sys.stdout.flush()
+        print(summarize(counts), file=sys.stderr)
+    finally:
+        storage.close()
+        if options.metrics_file is not None:
+            COMMANDS.metrics.dump(options.metrics_file)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,108 @@
+import json
+import math
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+# Latencies are counted in log-scale buckets: bucket i holds durations up to
+# BUCKET_BASE * BUCKET_GROWTH ** i seconds, so a percentile read from the
+# histogram is at most ~19% above the true value and memory stays fixed.
+BUCKET_BASE = 1e-6
+BUCKET_GROWTH = 2 ** 0.25
+BUCKET_COUNT = 128
+PERCENTILES = (50, 95, 99)
+UNKNOWN_COMMAND = "<unknown>"
+
+
+def timed_lines(lines: Iterable[str], finish: Callable[[], None]) -> Iterator[str]:
+    # Streamed output does its work while it is written, so the command is
+    # only recorded once the stream is exhausted or closed.
+    try:
+        yield from lines
+    finally:
+        finish()
+
+
+def _bucket(seconds: float) -> int:
+    if seconds <= BUCKET_BASE:
+        return 0
+    return min(BUCKET_COUNT - 1, math.ceil(math.log(seconds / BUCKET_BASE, BUCKET_GROWTH)))
+
+
+class CommandStats:
+    __slots__ = ("count", "errors", "total", "slowest", "_buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors: "Counter[str]" = Counter()
+        self.total = 0.0
+        self.slowest = 0.0
+        self._buckets: List[int] = [0] * BUCKET_COUNT
+
+    def record(self, seconds: float, code: str, ok: bool) -> None:
+        self.count += 1
+        if not ok:
+            self.errors[code] += 1
+        self.total += seconds
+        self.slowest = max(self.slowest, seconds)
+        self._buckets[_bucket(seconds)] += 1
+
+    def percentile(self, percent: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for index, size in enumerate(self._buckets):
+            seen += size
+            if seen >= rank:
+                return min(BUCKET_BASE * BUCKET_GROWTH ** index, self.slowest)
+        return self.slowest
+
+    def to_dict(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            "count": self.count,
+            "errors": dict(self.errors),
+            "total_seconds": self.total,
+            "max_seconds": self.slowest,
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent}_seconds"] = self.percentile(percent)
+        return summary
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.commands: Dict[str, CommandStats] = {}
+        # The server records commands from several worker threads at once.
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, code: str, ok: bool) -> None:
+        with self._lock:
+            stats = self.commands.get(name)
+            if stats is None:
+                stats = self.commands[name] = CommandStats()
+            stats.record(seconds, code, ok)
+
+    def report(self) -> str:
+        with self._lock:
+            if not self.commands:
+                return "No commands recorded yet."
+            lines = [
+                f"{'command':<14}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+            ]
+            for name, stats in sorted(self.commands.items()):
+                latencies = [stats.percentile(percent) for percent in PERCENTILES] + [stats.slowest]
+                lines.append(
+                    f"{name:<14}{stats.count:>8}{sum(stats.errors.values()):>8}"
+                    + "".join(f"{seconds * 1000:>10.3f}" for seconds in latencies)
+                )
+            return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"commands": {name: stats.to_dict() for name, stats in sorted(self.commands.items())}}
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+            file.write("\n")
@@ -1,5 +1,26 @@
-from typing import List, Optional
-from datetime import datetime
+import unicodedata
+from array import array
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any, ContextManager, Dict, Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+from datetime import date, datetime
+
+try:
+    import numpy as np
+except ImportError:  # optional: vectorized name checks for string arrays
+    np = None
+
+if TYPE_CHECKING:
+    from address_book import AddressBook
+
+NAME_ERROR = "Name must contain only letters"
+PHONE_ERROR = "Phone number must be 10 digits"
+BIRTHDAY_ERROR = "Invalid date format. Use DD.MM.YYYY"
+
+# validate_names returns a mask (True where the value is valid) and the
+# failure reason for each invalid position. Phones need no validator of
+# their own: Phone.normalize_many marks invalid numbers with None.
+Validation = Tuple[Sequence[bool], Dict[int, str]]
 
 
 class ValidationException(Exception):
@@ -7,6 +28,8 @@ class ValidationException(Exception):
 
 
 class Field:
+    __slots__ = ("value",)
+
     def __init__(self, value: str) -> None:
         self.value = value
 
@@ -14,69 +37,240 @@ class Field:
         return str(self.value)
 
 
+def normalize_name(value: str) -> str:
+    return unicodedata.normalize("NFKC", value).casefold()
+
+
 class Name(Field):
+    __slots__ = ("key",)
+
     def __init__(self, value: str) -> None:
         super().__init__(value)
         self.validate_name(value)
+        self.key: str = normalize_name(value)
 
     def validate_name(self, value: str) -> None:
         if not value.isalpha():
-            raise ValidationException("Name must contain only letters")
+            raise ValidationException(NAME_ERROR)
+
+
+PHONE_LENGTH = 10
+COUNTRY_CODE = "38"
+# Separators seen in imported numbers, e.g. "+38 (050) 123-45-67".
+PHONE_SEPARATORS = str.maketrans("", "", " \t()-./")
+
+
+def _is_phone_digits(digits: str) -> bool:
+    # isdigit() alone also accepts characters such as "²" that int() rejects.
+    return len(digits) == PHONE_LENGTH and digits.isascii() and digits.isdigit()
+
+
+def normalize_phone(value: str) -> str:
+    # Drops separators and an international prefix ("+38", "0038" or a bare
+    # "38" in front of ten digits). The result is only valid if it is then
+    # PHONE_LENGTH digits; anything else is returned for validation to reject.
+    digits = value.translate(PHONE_SEPARATORS)
+    if len(digits) == PHONE_LENGTH:
+        return digits
+    if digits.startswith("+"):
+        digits = digits[1:]
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    if len(digits) == PHONE_LENGTH + len(COUNTRY_CODE) and digits.startswith(COUNTRY_CODE):
+        digits = digits[len(COUNTRY_CODE):]
+    return digits
 
 
 class Phone(Field):
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
-        super().__init__(value)
-        self.validate_phone(value)
+        super().__init__(normalize_phone(value))
+        self.validate_phone(self.value)
 
     def validate_phone(self, value: str) -> None:
-        if not value.isdigit() or len(value) != 10:
-            raise ValidationException("Phone number must be 10 digits")
+        if not _is_phone_digits(value):
+            raise ValidationException(PHONE_ERROR)
+
+    @classmethod
+    def from_int(cls, number: int) -> "Phone":
+        phone = cls.__new__(cls)
+        phone.value = phone_to_str(number)
+        return phone
+
+    @staticmethod
+    def normalize_many(values: Iterable[str]) -> List[Optional[int]]:
+        # Import path: one call per row instead of a Phone object per number;
+        # None marks a value that is not a valid phone number.
+        numbers: List[Optional[int]] = []
+        for value in values:
+            digits = normalize_phone(value)
+            numbers.append(int(digits) if _is_phone_digits(digits) else None)
+        return numbers
+
+
+def phone_to_int(value: str) -> Optional[int]:
+    digits = normalize_phone(value)
+    if _is_phone_digits(digits):
+        return int(digits)
+    return None
+
+
+def phone_to_str(number: int) -> str:
+    return f"{number:010d}"
+
+
+DATE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(value: str) -> date:
+    # Plain DD.MM.YYYY is sliced directly; anything else strptime also
+    # accepts (e.g. "1.2.2000") goes through strptime. Both raise ValueError.
+    if (
+        len(value) == 10 and value[2] == "." and value[5] == "." and value.isascii()
+        and value[:2].isdigit() and value[3:5].isdigit() and value[6:].isdigit()
+    ):
+        return date(int(value[6:]), int(value[3:5]), int(value[:2]))
+    return datetime.strptime(value, "%d.%m.%Y").date()
+
+
+def format_date(value: date) -> str:
+    # strftime("%Y") does not pad years before 1000, which parse_date rejects.
+    return f"{value.day:02d}.{value.month:02d}.{value.year:04d}"
+
+
+def try_parse_date(value: Any) -> Optional[date]:
+    # None instead of an exception for anything parse_date rejects, including
+    # non-strings from JSON input.
+    try:
+        return parse_date(value)
+    except (ValueError, TypeError):
+        return None
 
 
 class Birthday(Field):
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
         try:
-            self.value: datetime.date = datetime.strptime(value, "%d.%m.%Y").date()
+            self.value: date = parse_date(value)
         except ValueError:
-            raise ValidationException("Invalid date format. Use DD.MM.YYYY")
+            raise ValidationException(BIRTHDAY_ERROR)
+
+    @classmethod
+    def from_date(cls, value: date) -> "Birthday":
+        birthday = cls.__new__(cls)
+        birthday.value = value
+        return birthday
+
+
+def validate_names(names: Any) -> Validation:
+    # `names` is a list of strings or a NumPy string array.
+    if np is not None and isinstance(names, np.ndarray):
+        mask = np.char.isalpha(names)
+        return mask, {int(index): NAME_ERROR for index in np.flatnonzero(~mask)}
+    mask = [name.isalpha() for name in names]
+    return mask, {index: NAME_ERROR for index, valid in enumerate(mask) if not valid}
 
 
 class Record:
+    __slots__ = ("name", "_phones", "birthday", "_book", "_rendered")
+
     def __init__(self, name: str) -> None:
         self.name: Name = Name(name)
-        self.phones: List[Phone] = []
+        self._phones: array = array("Q")
         self.birthday: Optional[Birthday] = None
-        
+        self._book: Optional["AddressBook"] = None
+        # Cached __str__; every mutator below resets it to None.
+        self._rendered: Optional[str] = None
+
+    @classmethod
+    def restore(cls, name: str, phones: Iterable[int], birthday: Optional[date] = None) -> "Record":
+        record = cls(name)
+        record._phones.extend(phones)
+        if birthday is not None:
+            record.birthday = Birthday.from_date(birthday)
+        return record
+
+    # Changes to a record that belongs to a book hold the book's write lock,
+    # so readers never see the record disagree with the book's indexes.
+    # add_phone_number and set_birthday leave locking to their callers.
+    def _writing(self) -> ContextManager[None]:
+        return nullcontext() if self._book is None else self._book._lock.write()
+
+    def _reading(self) -> ContextManager[None]:
+        return nullcontext() if self._book is None else self._book._lock.read()
+
+    @property
+    def phones(self) -> List[Phone]:
+        return [Phone.from_int(number) for number in self._phones]
+
+    @property
+    def phone_numbers(self) -> array:
+        return self._phones
+
     def add_phone(self, phone: str) -> None:
-        self.phones.append(Phone(phone))
+        number = int(Phone(phone).value)
+        with self._writing():
+            self.add_phone_number(number)
+
+    def add_phone_number(self, number: int) -> None:
+        self._phones.append(number)
+        self._rendered = None
+        if self._book is not None:
+            self._book._on_phone_added(self, number)
 
     def edit_phone(self, old_phone: str, new_phone: str) -> None:
-        for p in self.phones:
-            if p.value == old_phone:
-                p.value = new_phone
-                return
-        raise ValidationException("Phone number not found")
+        with self._writing():
+            old_number = phone_to_int(old_phone)
+            if old_number is None or old_number not in self._phones:
+                raise KeyError("Phone number not found")
+            new_number = int(Phone(new_phone).value)
+            self._phones[self._phones.index(old_number)] = new_number
+            self._rendered = None
+            if self._book is not None:
+                self._book._on_phone_edited(self, old_number, new_number)
     
     def find_phone(self, phone: str) -> Optional[Phone]:
-        for p in self.phones:
-            if p.value == phone:
-                return p
+        number = phone_to_int(phone)
+        if number is not None and number in self._phones:
+            return Phone.from_int(number)
         return None
     
     def remove_phone(self, phone: str) -> None:
-        for p in self.phones:
-            if p.value == phone:
-                self.phones.remove(p)
-                return
-        raise ValidationException("Phone number not found")
+        with self._writing():
+            number = phone_to_int(phone)
+            if number is None or number not in self._phones:
+                raise KeyError("Phone number not found")
+            self._phones.remove(number)
+            self._rendered = None
+            if self._book is not None:
+                self._book._on_phone_removed(self, number)
 
     def add_birthday(self, birthday: str) -> None:
-        self.birthday = Birthday(birthday)
+        parsed = Birthday(birthday)
+        with self._writing():
+            self.set_birthday(parsed)
+
+    def set_birthday(self, birthday: Birthday) -> None:
+        old_birthday = self.birthday
+        self.birthday = birthday
+        self._rendered = None
+        if self._book is not None:
+            self._book._on_birthday_changed(self, old_birthday)
         
     def show_birthday(self) -> str:
-        return self.birthday.value.strftime("%d.%m.%Y") if self.birthday else "Birthday not set"
+        return format_date(self.birthday.value) if self.birthday else "Birthday not set"
 
     def __str__(self) -> str:
-        birthday_str = f", birthday: {self.show_birthday()}" if self.birthday else ""
-        return f"Contact name: {self.name.value}, phones: {'; '.join(p.value for p in self.phones)}{birthday_str}"
\ No newline at end of file
+        rendered = self._rendered
+        if rendered is None:
+            # Rendered under the read lock so a line built from a half-applied
+            # change is never cached.
+            with self._reading():
+                birthday_str = f", birthday: {self.show_birthday()}" if self.birthday else ""
+                rendered = self._rendered = (
+                    f"Contact name: {self.name.value}, phones: {'; '.join(map(phone_to_str, self._phones))}{birthday_str}"
+                )
+        return rendered
\ No newline at end of file
@@ -0,0 +1,253 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class SortedKeyList:
+    # A list of sorted buckets: inserts and deletes only shift one bucket,
+    # lookups bisect the bucket maxima first and then the bucket itself.
+    # A Fenwick tree over the bucket sizes gives O(log n) rank and offset.
+    LOAD = 1000
+
+    def __init__(self, keys: Iterable[str] = ()) -> None:
+        ordered = sorted(keys)
+        self._buckets: List[List[str]] = [
+            ordered[i:i + self.LOAD] for i in range(0, len(ordered), self.LOAD)
+        ]
+        self._maxes: List[str] = [bucket[-1] for bucket in self._buckets]
+        self._len = len(ordered)
+        self._rebuild_tree()
+
+    def _rebuild_tree(self) -> None:
+        tree = [0] + [len(bucket) for bucket in self._buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, position: int, delta: int) -> None:
+        i = position + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _tree_prefix(self, position: int) -> int:
+        # Number of keys in the buckets before `position`.
+        total = 0
+        while position > 0:
+            total += self._tree[position]
+            position -= position & -position
+        return total
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        # (bucket, offset inside the bucket) of the key at `index`.
+        position = 0
+        step = 1 << (len(self._tree).bit_length() - 1)
+        while step:
+            following = position + step
+            if following < len(self._tree) and self._tree[following] <= index:
+                position = following
+                index -= self._tree[following]
+            step >>= 1
+        return position, index
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[str]:
+        for bucket in self._buckets:
+            yield from bucket
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("index out of range")
+        position, offset = self._locate(index)
+        return self._buckets[position][offset]
+
+    def __contains__(self, key: str) -> bool:
+        position = bisect_left(self._maxes, key)
+        if position == len(self._maxes):
+            return False
+        bucket = self._buckets[position]
+        index = bisect_left(bucket, key)
+        return index < len(bucket) and bucket[index] == key
+
+    def rank(self, key: str) -> int:
+        # Number of keys smaller than `key`.
+        position = bisect_left(self._maxes, key)
+        if position == len(self._maxes):
+            return self._len
+        return self._tree_prefix(position) + bisect_left(self._buckets[position], key)
+
+    def add(self, key: str) -> None:
+        self._len += 1
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._rebuild_tree()
+            return
+
+        position = bisect_right(self._maxes, key)
+        if position == len(self._maxes):
+            position -= 1
+            self._buckets[position].append(key)
+            self._maxes[position] = key
+        else:
+            insort(self._buckets[position], key)
+        if len(self._buckets[position]) > 2 * self.LOAD:
+            bucket = self._buckets[position]
+            self._buckets[position:position + 1] = [bucket[:self.LOAD], bucket[self.LOAD:]]
+            self._maxes[position:position + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+            self._rebuild_tree()
+        else:
+            self._tree_add(position, 1)
+
+    def discard(self, key: str) -> None:
+        position = bisect_left(self._maxes, key)
+        if position == len(self._maxes):
+            return
+        bucket = self._buckets[position]
+        index = bisect_left(bucket, key)
+        if index == len(bucket) or bucket[index] != key:
+            return
+        del bucket[index]
+        self._len -= 1
+        if not bucket:
+            del self._buckets[position]
+            del self._maxes[position]
+            self._rebuild_tree()
+        else:
+            self._maxes[position] = bucket[-1]
+            self._tree_add(position, -1)
+
+    def islice(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        # Keys at positions start <= i < stop.
+        stop = self._len if stop is None else min(stop, self._len)
+        if start >= stop:
+            return
+        remaining = stop - start
+        position, offset = self._locate(start)
+        for bucket in self._buckets[position:]:
+            chunk = bucket[offset:offset + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            if not remaining:
+                return
+            offset = 0
+
+    def irange(self, start: Optional[str] = None, stop: Optional[str] = None) -> Iterator[str]:
+        # Keys with start <= key < stop; None leaves that side open.
+        first = 0 if start is None else self.rank(start)
+        last = None if stop is None else self.rank(stop)
+        return self.islice(first, last)
+
+    def prefixed(self, prefix: str) -> Iterator[str]:
+        for key in self.irange(prefix):
+            if not key.startswith(prefix):
+                return
+            yield key
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(query: str) -> Callable[[str], int]:
+    # Myers' bit-parallel Levenshtein distance: one pass over the key with a
+    # few integer operations per character, the query's bitmasks built once.
+    length = len(query)
+    masks: Dict[str, int] = {}
+    for i, char in enumerate(query):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    full = (1 << length) - 1
+    last = 1 << (length - 1) if length else 0
+
+    def distance(key: str) -> int:
+        if not length:
+            return len(key)
+        positive, negative, score = full, 0, length
+        for char in key:
+            match = masks.get(char, 0)
+            vertical = match | negative
+            horizontal = (((match & positive) + positive) ^ positive) | match
+            up = negative | (~(horizontal | positive) & full)
+            down = positive & horizontal
+            if up & last:
+                score += 1
+            elif down & last:
+                score -= 1
+            up = ((up << 1) | 1) & full
+            down = (down << 1) & full
+            positive = down | (~(vertical | up) & full)
+            negative = up & vertical
+        return score
+
+    return distance
+
+
+class TrigramIndex:
+    # Postings are split by key length so a query only looks at keys whose
+    # length is within max_distance of its own.
+    def __init__(self, keys: Iterable[str] = ()) -> None:
+        self._postings: Dict[Tuple[str, int], Set[str]] = {}
+        self._lengths: Dict[int, Set[str]] = {}
+        for key in keys:
+            self.add(key)
+
+    def add(self, key: str) -> None:
+        length = len(key)
+        self._lengths.setdefault(length, set()).add(key)
+        for gram in _trigrams(key):
+            self._postings.setdefault((gram, length), set()).add(key)
+
+    def discard(self, key: str) -> None:
+        length = len(key)
+        keys = self._lengths.get(length)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._lengths[length]
+        for gram in _trigrams(key):
+            keys = self._postings.get((gram, length))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram, length]
+
+    def search(self, query: str, max_distance: int = 1) -> List[Tuple[int, str]]:
+        grams = _trigrams(query)
+        lengths = range(max(1, len(query) - max_distance), len(query) + max_distance + 1)
+
+        # Each edit destroys at most three of the query's trigrams, so a match
+        # shares at least `required` of them and must therefore appear in one
+        # of the len(grams) - required + 1 rarest posting lists.
+        required = len(grams) - 3 * max_distance
+        candidates: Set[str] = set()
+        if required <= 0:
+            # Short queries: a match may share no trigram at all, so every key
+            # of a close enough length is a candidate.
+            for length in lengths:
+                candidates.update(self._lengths.get(length, ()))
+        else:
+            postings = []
+            for gram in grams:
+                lists = [self._postings[gram, length] for length in lengths if (gram, length) in self._postings]
+                postings.append((sum(map(len, lists)), lists))
+            postings.sort(key=lambda item: item[0])
+            for _, lists in postings[:len(grams) - required + 1]:
+                for keys in lists:
+                    candidates.update(keys)
+
+        distance = edit_distance(query)
+        matches = []
+        for key in candidates:
+            if required > 0 and len(grams.intersection(_trigrams(key))) < required:
+                continue
+            score = distance(key)
+            if score <= max_distance:
+                matches.append((score, key))
+        matches.sort()
+        return matches
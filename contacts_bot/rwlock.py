@@ -0,0 +1,89 @@
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class _Held:
+    # A reusable `with` target; cheaper than a generator-based context
+    # manager on lookups that take the lock millions of times.
+    __slots__ = ("_acquire", "_release")
+
+    def __init__(self, acquire: Callable[[], None], release: Callable[[], None]) -> None:
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self) -> None:
+        self._acquire()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._release()
+
+
+class ReadWriteLock:
+    # Any number of readers or a single writer. Both sides are reentrant and
+    # the writer may also read; a reader can not upgrade to writing, since
+    # two readers doing so would wait on each other forever. Waiting writers
+    # keep new readers out so a steady stream of lookups can not starve them.
+    def __init__(self) -> None:
+        # Entered directly: a plain Lock is much cheaper to enter than the
+        # Condition wrapping it.
+        self._mutex = threading.Lock()
+        self._condition = threading.Condition(self._mutex)
+        self._readers: Dict[int, int] = {}
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._read = _Held(self.acquire_read, self.release_read)
+        self._write = _Held(self.acquire_write, self.release_write)
+
+    def acquire_read(self) -> None:
+        me = threading.get_ident()
+        with self._mutex:
+            if self._writer == me or me in self._readers:
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers[me] = 1
+
+    def release_read(self) -> None:
+        me = threading.get_ident()
+        with self._mutex:
+            depth = self._readers[me] - 1
+            if depth:
+                self._readers[me] = depth
+                return
+            del self._readers[me]
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._mutex:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("Cannot take the write lock while holding the read lock")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self) -> None:
+        with self._mutex:
+            if self._writer != threading.get_ident():
+                raise RuntimeError("Cannot release a write lock held by another thread")
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._condition.notify_all()
+
+    def read(self) -> _Held:
+        return self._read
+
+    def write(self) -> _Held:
+        return self._write
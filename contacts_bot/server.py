@@ -0,0 +1,121 @@
+import asyncio
+import itertools
+import os
+import stat
+from collections import Counter
+from typing import Iterator, Optional, Tuple, TYPE_CHECKING
+from commands import COMMANDS
+from utils import parse_input
+
+if TYPE_CHECKING:
+    from address_book import AddressBook
+    from storage import Storage
+
+UNIX_PREFIX = "unix:"
+DEFAULT_HOST = "127.0.0.1"
+# Lines of streamed output produced per trip to a worker thread and written
+# before waiting for the client to catch up.
+STREAM_CHUNK_LINES = 256
+
+
+def parse_address(address: str) -> Tuple[Optional[str], Optional[int], Optional[str]]:
+    # "unix:/path/to/socket", "host:port" or ":port" (localhost).
+    if address.startswith(UNIX_PREFIX):
+        path = address[len(UNIX_PREFIX):]
+        if not path:
+            raise ValueError("Expected a socket path after 'unix:'.")
+        return None, None, path
+    host, separator, port = address.rpartition(":")
+    if not separator or not port.isdecimal():
+        raise ValueError(f"Expected HOST:PORT or unix:PATH, got {address!r}.")
+    return host or DEFAULT_HOST, int(port), None
+
+
+def _next_chunk(lines: Iterator[str]) -> str:
+    return "".join(f"{line}\n" for line in itertools.islice(lines, STREAM_CHUNK_LINES))
+
+
+class CommandServer:
+    # Each connection sends one command per line and may send many before
+    # reading any replies; replies come back in order, each followed by an
+    # empty line. Commands run in worker threads so a slow one does not stall
+    # other clients; the book's own locking keeps each change whole.
+    def __init__(self, book: "AddressBook", storage: "Storage") -> None:
+        self.book = book
+        self.storage = storage
+        self.counts: "Counter[str]" = Counter()
+
+    async def execute(self, line: str, writer: asyncio.StreamWriter) -> bool:
+        command, args = parse_input(line)
+        if not command:
+            writer.write(b"Please enter a command\n\n")
+            await writer.drain()
+            return False
+
+        result = await asyncio.to_thread(COMMANDS.dispatch, command, args, self.book)
+        self.counts[result.code] += 1
+        if result.lines is None:
+            writer.write(f"{result.message}\n\n".encode("utf-8"))
+        else:
+            lines = iter(result.lines)
+            try:
+                while True:
+                    chunk = await asyncio.to_thread(_next_chunk, lines)
+                    if not chunk:
+                        break
+                    writer.write(chunk.encode("utf-8"))
+                    await writer.drain()
+            finally:
+                # Records the command's metrics even if the client went away.
+                close = getattr(lines, "close", None)
+                if close is not None:
+                    close()
+            writer.write(b"\n")
+        await writer.drain()
+        await asyncio.to_thread(self.storage.flush)
+
+        entry = COMMANDS.get(command)
+        return entry is not None and entry.exits
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # a line longer than the stream buffer limit
+                    break
+                if not line:
+                    break
+                if await self.execute(line.decode("utf-8", errors="replace"), writer):
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def _remove_stale_socket(path: str) -> None:
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def serve(server: CommandServer, address: str) -> None:
+    host, port, path = parse_address(address)
+    if path is not None:
+        _remove_stale_socket(path)
+        listener = await asyncio.start_unix_server(server.handle_client, path=path)
+    else:
+        listener = await asyncio.start_server(server.handle_client, host, port)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if path is not None:
+            _remove_stale_socket(path)
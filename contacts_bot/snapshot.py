@@ -0,0 +1,198 @@
+import itertools
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import date
+from typing import Iterable, Iterator, List, Optional, Tuple
+from models import Record, normalize_name
+
+try:
+    import numpy as np
+except ImportError:  # optional: speeds up birthday scans over large snapshots
+    np = None
+
+# Layout (little-endian, every column 8-byte aligned except the trailing heap):
+#   header | name_offsets Q[count+1] | phone_offsets Q[count+1] | phones Q[phone_count]
+#   | birthdays i[count] (date ordinal, 0 = not set) | padding | name heap (utf-8)
+# Rows are sorted by the normalized name key.
+MAGIC = b"ABSNAP\x00\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQQ")
+# The phone index packs (number << ROW_BITS) | row into one uint64; phone
+# numbers are 10 digits, which fit in the remaining 34 bits, and rows are
+# far below 2 ** 30.
+ROW_BITS = 30
+ROW_MASK = (1 << ROW_BITS) - 1
+
+Row = Tuple[str, List[int], int]
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def row_key(row: Row) -> str:
+    return normalize_name(row[0])
+
+
+def record_to_row(record: "Record") -> Row:
+    birthday = record.birthday.value.toordinal() if record.birthday else 0
+    return record.name.value, record.phone_numbers.tolist(), birthday
+
+
+def row_to_record(row: Row) -> "Record":
+    name, phones, birthday = row
+    return Record.restore(name, phones, date.fromordinal(birthday) if birthday else None)
+
+
+def write_snapshot(path: str, rows: Iterable[Row], seq: int) -> None:
+    if sys.byteorder != "little":
+        raise OSError("Binary snapshots are only supported on little-endian hosts")
+
+    name_offsets = array("Q", [0])
+    phone_offsets = array("Q", [0])
+    phones = array("Q")
+    birthdays = array("i")
+    heap = bytearray()
+    for name, row_phones, birthday in rows:
+        heap += name.encode("utf-8")
+        name_offsets.append(len(heap))
+        phones.extend(row_phones)
+        phone_offsets.append(len(phones))
+        birthdays.append(birthday)
+
+    count = len(birthdays)
+    header = HEADER.pack(MAGIC, VERSION, 0, count, len(phones), len(heap), seq)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(header)
+        file.write(name_offsets.tobytes())
+        file.write(phone_offsets.tobytes())
+        file.write(phones.tobytes())
+        file.write(birthdays.tobytes())
+        file.write(b"\x00" * (_align(file.tell()) - file.tell()))
+        file.write(heap)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class SnapshotView:
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, phone_count, heap_size, seq = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"Unsupported snapshot format: {path}")
+        if sys.byteorder != "little":
+            self._mmap.close()
+            raise OSError("Binary snapshots are only supported on little-endian hosts")
+
+        self.count: int = count
+        self.seq: int = seq
+        buffer = memoryview(self._mmap)
+        offset = HEADER.size
+        self._name_offsets = buffer[offset:offset + 8 * (count + 1)].cast("Q")
+        offset += 8 * (count + 1)
+        self._phone_offsets = buffer[offset:offset + 8 * (count + 1)].cast("Q")
+        offset += 8 * (count + 1)
+        self._phones = buffer[offset:offset + 8 * phone_count].cast("Q")
+        offset += 8 * phone_count
+        self._birthdays = buffer[offset:offset + 4 * count].cast("i")
+        offset = _align(offset + 4 * count)
+        self._heap = buffer[offset:offset + heap_size]
+        self._years: Optional[Tuple[int, int]] = None
+        # Every (number, row) pair, packed and sorted; built on the first
+        # phone lookup.
+        self._phone_index: Optional[array] = None
+
+    def name(self, index: int) -> str:
+        return str(self._heap[self._name_offsets[index]:self._name_offsets[index + 1]], "utf-8")
+
+    def row(self, index: int) -> Row:
+        phones = self._phones[self._phone_offsets[index]:self._phone_offsets[index + 1]].tolist()
+        return self.name(index), phones, self._birthdays[index]
+
+    def key(self, index: int) -> str:
+        return normalize_name(self.name(index))
+
+    def lookup(self, key: str) -> Optional[int]:
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.key(low) == key:
+            return low
+        return None
+
+    def _year_range(self) -> Tuple[int, int]:
+        if self._years is None:
+            if np is not None:
+                column = np.frombuffer(self._birthdays, dtype=np.int32)
+                ordinals = column[column > 0]
+                bounds = (int(ordinals.min()), int(ordinals.max())) if ordinals.size else None
+            else:
+                ordinals = [ordinal for ordinal in self._birthdays if ordinal]
+                bounds = (min(ordinals), max(ordinals)) if ordinals else None
+            if bounds is None:
+                self._years = (1, 0)
+            else:
+                self._years = (date.fromordinal(bounds[0]).year, date.fromordinal(bounds[1]).year)
+        return self._years
+
+    def birthday_rows(self, days: Iterable[Tuple[int, int]]) -> List[int]:
+        # Rows whose birthday falls on any of the (month, day) pairs. The
+        # pairs are expanded to concrete ordinals for every stored birth year
+        # so the column scan is a plain membership test.
+        first_year, last_year = self._year_range()
+        targets = set()
+        for month, day in days:
+            for year in range(first_year, last_year + 1):
+                try:
+                    targets.add(date(year, month, day).toordinal())
+                except ValueError:
+                    continue
+        if not targets:
+            return []
+        if np is not None:
+            column = np.frombuffer(self._birthdays, dtype=np.int32)
+            return np.flatnonzero(np.isin(column, np.fromiter(targets, dtype=np.int32))).tolist()
+        return [index for index, ordinal in enumerate(self._birthdays) if ordinal in targets]
+
+    def _phones_by_number(self) -> array:
+        if self._phone_index is None:
+            index = array("Q")
+            if np is not None:
+                column = np.frombuffer(self._phones, dtype=np.uint64)
+                sizes = np.diff(np.frombuffer(self._phone_offsets, dtype=np.int64))
+                owners = np.repeat(np.arange(self.count, dtype=np.uint64), sizes)
+                index.frombytes(np.sort((column << np.uint64(ROW_BITS)) | owners).tobytes())
+            else:
+                offsets = self._phone_offsets.tolist()
+                owners = itertools.chain.from_iterable(
+                    itertools.repeat(row, offsets[row + 1] - offsets[row]) for row in range(self.count)
+                )
+                index.extend(sorted((number << ROW_BITS) | row for number, row in zip(self._phones.tolist(), owners)))
+            self._phone_index = index
+        return self._phone_index
+
+    def phone_rows(self, number: int) -> List[int]:
+        # Rows holding `number`, in row order. Building the index costs one
+        # sort of the phone column; every lookup after that is a bisect.
+        index = self._phones_by_number()
+        first = bisect_left(index, number << ROW_BITS)
+        last = bisect_left(index, (number + 1) << ROW_BITS, first)
+        return list(dict.fromkeys(item & ROW_MASK for item in index[first:last]))
+
+    def rows(self, skip: Iterable[int] = ()) -> Iterator[Row]:
+        skip = set(skip)
+        for index in range(self.count):
+            if index not in skip:
+                yield self.row(index)
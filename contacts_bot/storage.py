@@ -0,0 +1,168 @@
+import heapq
+import json
+import os
+import threading
+from typing import IO, Iterable, List, Optional
+from address_book import AddressBook
+from models import Record
+from snapshot import Row, SnapshotView, record_to_row, row_key, write_snapshot
+
+SNAPSHOT_FILE = "snapshot.bin"
+JOURNAL_PREFIX = "journal-"
+JOURNAL_SUFFIX = ".log"
+
+
+def apply_entry(book: "AddressBook", op: str, args: List[str]) -> None:
+    if op == "put":
+        name, phones, birthday = args
+        record = Record(name)
+        for phone in filter(None, phones.split(";")):
+            record.add_phone(phone)
+        if birthday:
+            record.add_birthday(birthday)
+        book.add_record(record)
+    elif op == "delete":
+        book.delete(args[0])
+    elif op == "phone":
+        book.find(args[0]).add_phone(args[1])
+    elif op == "edit":
+        book.find(args[0]).edit_phone(args[1], args[2])
+    elif op == "remove":
+        book.find(args[0]).remove_phone(args[1])
+    elif op == "birthday":
+        book.find(args[0]).add_birthday(args[1])
+    else:
+        raise ValueError(f"Unknown journal operation: {op}")
+
+
+class Storage:
+    def __init__(self, directory: str, compact_threshold: int = 100_000) -> None:
+        self.directory = directory
+        self.compact_threshold = compact_threshold
+        self._seq = 0
+        self._journal_entries = 0
+        self._journal: Optional[IO[str]] = None
+        self._book: Optional["AddressBook"] = None
+        self._compactor: Optional[threading.Thread] = None
+        self._compact_due = False
+        # Guards the journal file, which the compactor swaps for a new one.
+        self._journal_lock = threading.Lock()
+        # Server workers flush concurrently; only one may start a compactor.
+        self._compact_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    def _journal_paths(self) -> List[str]:
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith(JOURNAL_PREFIX) and name.endswith(JOURNAL_SUFFIX)
+        )
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _open_journal(self) -> None:
+        path = os.path.join(self.directory, f"{JOURNAL_PREFIX}{self._seq + 1:012d}{JOURNAL_SUFFIX}")
+        self._journal = open(path, "a", encoding="utf-8")
+        self._journal_entries = 0
+
+    def load(self) -> "AddressBook":
+        book = AddressBook()
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            snapshot = SnapshotView(self.snapshot_path)
+            book.attach_snapshot(snapshot)
+            snapshot_seq = snapshot.seq
+        self._seq = snapshot_seq
+
+        replayed = 0
+        for path in self._journal_paths():
+            with open(path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        seq, op, *args = json.loads(line)
+                    except ValueError:
+                        break  # torn write at the end of a journal
+                    if seq <= snapshot_seq:
+                        continue
+                    apply_entry(book, op, args)
+                    self._seq = seq
+                    replayed += 1
+
+        book.storage = self
+        self._book = book
+        self._open_journal()
+        if replayed >= self.compact_threshold:
+            self.compact()
+        return book
+
+    def append(self, op: str, *args: str) -> None:
+        # Called from inside a change to the book, which may be half-applied
+        # (a replace journals "delete" before its "put"), so compaction is
+        # only flagged here and started by checkpoint() once it is done.
+        with self._journal_lock:
+            self._seq += 1
+            self._journal.write(json.dumps([self._seq, op, *args], ensure_ascii=False) + "\n")
+            self._journal_entries += 1
+            if self._journal_entries >= self.compact_threshold and self._journal_entries >= len(self._book):
+                self._compact_due = True
+
+    def checkpoint(self) -> None:
+        # Call between commands, never while a change is being applied.
+        if not self._compact_due:
+            return
+        with self._compact_lock:
+            # Stays due while a compactor runs, so the next checkpoint retries.
+            if self._compact_due and self._start_compactor():
+                self._compact_due = False
+
+    def flush(self) -> None:
+        with self._journal_lock:
+            if self._journal is not None:
+                self._journal.flush()
+        self.checkpoint()
+
+    def compact(self) -> None:
+        with self._compact_lock:
+            self._start_compactor()
+
+    def _start_compactor(self) -> bool:
+        if self._book is None or (self._compactor is not None and self._compactor.is_alive()):
+            return False
+        self._compactor = threading.Thread(target=self._write_snapshot, args=(self._book,), daemon=True)
+        self._compactor.start()
+        return True
+
+    def _write_snapshot(self, book: "AddressBook") -> None:
+        # The book's read lock keeps writers out while its state and the
+        # matching seq are captured and the journal is rotated; sorting and
+        # writing the snapshot happen after it is released.
+        with book._lock.read(), book._materialize, self._journal_lock:
+            rows: Iterable[Row] = [record_to_row(record) for record in book.data.values()]
+            base, base_taken = book._base, set(book._base_taken)
+            seq = self._seq
+            self._journal.close()
+            self._open_journal()
+            active_journal = self._journal.name
+        rows = sorted(rows, key=row_key)
+        if base is not None:
+            rows = heapq.merge(rows, base.rows(base_taken), key=row_key)
+        write_snapshot(self.snapshot_path, rows, seq)
+        for path in self._journal_paths():
+            if path < active_journal:
+                os.remove(path)
+
+    def close(self) -> None:
+        with self._compact_lock:
+            if self._compactor is not None:
+                self._compactor.join()
+            self._compact_due = False
+        if self._journal is not None:
+            self._journal.close()
+            if self._journal_entries == 0:
+                os.remove(self._journal.name)
+            self._journal = None
+        if self._book is not None:
+            self._book.storage = None
+            self._book = None
@@ -1,15 +1,89 @@
-from typing import Callable, List, Tuple, Any
+from dataclasses import dataclass
+from typing import IO, Callable, Iterable, List, Optional, Tuple, Any, Type, Union
+from models import ValidationException
 
+OK = "ok"
+# Error categories, in the order summaries list them.
+USAGE = "usage"
+NOT_FOUND = "not_found"
+VALIDATION = "validation"
+INTERNAL = "internal"
+ERROR_CODES = (USAGE, NOT_FOUND, VALIDATION, INTERNAL)
 
-def input_error(func: Callable[..., Any]) -> Callable[..., Any]:
-    def inner(*args: Any, **kwargs: Any) -> Any:
+# Checked in order, so subclasses come before their bases; anything not
+# listed is a bug and reported as INTERNAL.
+EXCEPTION_CODES: Tuple[Tuple[Type[Exception], str], ...] = (
+    (ValidationException, VALIDATION),
+    (KeyError, NOT_FOUND),
+    (FileNotFoundError, NOT_FOUND),
+    # A path the user gave that is a directory, unreadable and so on.
+    (OSError, VALIDATION),
+    (IndexError, USAGE),
+    (ValueError, VALIDATION),
+)
+
+
+@dataclass
+class Result:
+    code: str
+    message: str = ""
+    # Set instead of `message` when a handler streams its output.
+    lines: Optional[Iterable[str]] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.code == OK
+
+    @classmethod
+    def success(cls, output: Union[str, Iterable[str]]) -> "Result":
+        if isinstance(output, str):
+            return cls(OK, output)
+        return cls(OK, lines=output)
+
+    @classmethod
+    def error(cls, code: str, message: str) -> "Result":
+        return cls(code, message)
+
+    @classmethod
+    def from_exception(cls, error: Exception) -> "Result":
+        for exception_type, code in EXCEPTION_CODES:
+            if isinstance(error, exception_type):
+                break
+        else:
+            code = INTERNAL
+        # str(KeyError) would wrap the message in quotes.
+        message = error.args[0] if isinstance(error, KeyError) and error.args else str(error)
+        return cls(code, str(message) or type(error).__name__)
+
+    def __str__(self) -> str:
+        if self.lines is not None:
+            return "\n".join(self.lines)
+        return self.message
+
+
+# What a handler body may return; input_error turns it into a Result.
+Output = Union[Result, str, Iterable[str]]
+
+
+def input_error(func: Callable[..., Any]) -> Callable[..., Result]:
+    def inner(*args: Any, **kwargs: Any) -> Result:
         try:
-            return func(*args, **kwargs)
+            output = func(*args, **kwargs)
         except Exception as e:
-            return str(e)
+            return Result.from_exception(e)
+        return output if isinstance(output, Result) else Result.success(output)
     return inner
 
 
+def write_output(result: Union[Result, str, Iterable[str]], out: IO[str]) -> None:
+    if isinstance(result, Result):
+        result = result.message if result.lines is None else result.lines
+    if isinstance(result, str):
+        out.write(f"{result}\n")
+    else:
+        out.writelines(f"{line}\n" for line in result)
+
+
 def parse_input(user_input: str) -> Tuple[str, List[str]]:
     if not user_input.strip():
         return "", []
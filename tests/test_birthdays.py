@@ -0,0 +1,74 @@
+from datetime import date
+
+import pytest
+
+from address_book import LEAP_DAY_ON_MAR_1, MAX_BIRTHDAY_WINDOW, AddressBook
+from congratulations import CongratulationCalendar, load_holidays
+from models import Record
+
+
+def make_book(**birthdays):
+    book = AddressBook()
+    for name, birthday in birthdays.items():
+        record = Record(name)
+        record.add_birthday(birthday)
+        book.add_record(record)
+    return book
+
+
+def listed(book, days, start):
+    return [(item["name"], item["birthday"]) for item in book.get_upcoming_birthdays(days, start)]
+
+
+def test_window_includes_both_ends():
+    book = make_book(Anna="01.01.1990", Bob="08.01.1991", Cy="09.01.1992", Dora="31.12.1993")
+    assert listed(book, 7, date(2026, 1, 1)) == [("Anna", "01.01.2026"), ("Bob", "08.01.2026")]
+    assert listed(book, 0, date(2026, 1, 1)) == [("Anna", "01.01.2026")]
+
+
+@pytest.mark.parametrize("days", [364, 365, MAX_BIRTHDAY_WINDOW])
+def test_long_windows_list_each_birthday_once(days):
+    book = make_book(Anna="01.01.1990", Bob="31.12.1991", Cy="29.02.2000")
+    assert sorted(listed(book, days, date(2026, 1, 1))) == [
+        ("Anna", "01.01.2026"), ("Bob", "31.12.2026"), ("Cy", "28.02.2026"),
+    ]
+
+
+def test_window_is_bounded():
+    book = make_book()
+    with pytest.raises(ValueError):
+        book.get_upcoming_birthdays(MAX_BIRTHDAY_WINDOW + 1, date(2026, 1, 1))
+    with pytest.raises(ValueError):
+        book.get_upcoming_birthdays(-1, date(2026, 1, 1))
+
+
+def test_leap_day_birthdays():
+    book = make_book(Anna="29.02.2000")
+    assert listed(book, 3, date(2027, 2, 27)) == [("Anna", "28.02.2027")]
+    assert listed(book, 3, date(2028, 2, 27)) == [("Anna", "29.02.2028")]
+    book.leap_day_policy = LEAP_DAY_ON_MAR_1
+    assert listed(book, 3, date(2027, 2, 27)) == [("Anna", "01.03.2027")]
+    # Only reached on Feb 29 in a leap year.
+    assert listed(book, 0, date(2028, 3, 1)) == []
+
+
+def test_congratulations_move_to_the_next_working_day():
+    book = make_book(Anna="03.01.1990", Bob="31.12.1991")
+    # 3 January 2026 is a Saturday.
+    assert book.get_upcoming_birthdays(2, date(2026, 1, 1))[0]["congratulation_date"] == "05.01.2026"
+    book.calendar = CongratulationCalendar(holidays=[date(2026, 1, 5)], recurring=[(1, 6)])
+    assert book.get_upcoming_birthdays(2, date(2026, 1, 1))[0]["congratulation_date"] == "07.01.2026"
+    # 31 December 2022 is a Saturday; the next working day is in 2023.
+    assert book.get_upcoming_birthdays(0, date(2022, 12, 31))[0]["congratulation_date"] == "02.01.2023"
+
+
+def test_load_holidays(tmp_path):
+    path = tmp_path / "holidays.txt"
+    path.write_text("# comment\n05.01.2026\n\n06.01  # every year\n", encoding="utf-8")
+    calendar = load_holidays(str(path))
+    assert calendar.holidays == {date(2026, 1, 5)}
+    assert calendar.recurring == {(1, 6)}
+
+    path.write_text("31.02\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=":1:"):
+        load_holidays(str(path))
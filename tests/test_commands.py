@@ -0,0 +1,62 @@
+from address_book import AddressBook
+from commands import COMMANDS
+from utils import NOT_FOUND, OK, USAGE, VALIDATION
+
+
+def test_dispatch_enforces_arity():
+    book = AddressBook()
+    result = COMMANDS.dispatch("add", ["Anna"], book)
+    assert result.code == USAGE
+    assert str(result) == "Usage: add <name> <phone>"
+    assert COMMANDS.dispatch("phone", ["Anna", "Bob"], book).code == USAGE
+    assert COMMANDS.dispatch("add", ["Anna", "0500000000"], book).code == OK
+
+
+def test_search_accepts_fuzzy_on_either_side():
+    book = AddressBook()
+    book.add_contact("Anna", "0500000000")
+    expected = "Contact name: Anna, phones: 0500000000"
+    assert str(COMMANDS.dispatch("search", ["--fuzzy", "Ana"], book)) == expected
+    assert str(COMMANDS.dispatch("search", ["Ana", "--fuzzy"], book)) == expected
+    assert COMMANDS.dispatch("search", ["Ana", "Bob"], book).code == USAGE
+
+
+def test_birthdays_window_is_capped():
+    book = AddressBook()
+    assert COMMANDS.dispatch("birthdays", ["366"], book).code == OK
+    result = COMMANDS.dispatch("birthdays", ["3000000"], book)
+    assert result.code == VALIDATION
+    assert str(result) == "Number of days must be at most 366."
+
+
+def test_invalid_input_is_a_validation_error(tmp_path):
+    book = AddressBook()
+    book.add_contact("Anna", "0500000000")
+    cases = [
+        ("add", ["Anna1", "0500000001"], "Name must contain only letters"),
+        ("add", ["Bob", "123"], "Phone number must be 10 digits"),
+        ("change", ["Anna", "0500000000", "123"], "Phone number must be 10 digits"),
+        ("add-birthday", ["Anna", "31.02.2000"], "Invalid date format. Use DD.MM.YYYY"),
+    ]
+    for command, args, message in cases:
+        result = COMMANDS.dispatch(command, args, book)
+        assert (result.code, str(result)) == (VALIDATION, message)
+    assert COMMANDS.dispatch("import", [str(tmp_path)], book).code == VALIDATION
+    assert COMMANDS.dispatch("import", [str(tmp_path / "missing.csv")], book).code == NOT_FOUND
+
+
+def test_non_ascii_digits_are_validation_errors():
+    book = AddressBook()
+    result = COMMANDS.dispatch("add", ["Bob", "012345678²"], book)
+    assert (result.code, str(result)) == (VALIDATION, "Phone number must be 10 digits")
+    assert COMMANDS.dispatch("birthdays", ["3²"], book).code == VALIDATION
+    assert COMMANDS.dispatch("all", ["--size", "²"], book).code == VALIDATION
+
+
+def test_missing_phone_is_not_found():
+    book = AddressBook()
+    book.add_contact("Anna", "0500000000")
+    result = COMMANDS.dispatch("change", ["Anna", "0500000001", "0500000002"], book)
+    assert (result.code, str(result)) == (NOT_FOUND, "Phone number not found")
+    result = COMMANDS.dispatch("change", ["Bob", "0500000000", "0500000002"], book)
+    assert (result.code, str(result)) == (NOT_FOUND, "Contact not found.")
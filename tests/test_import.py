@@ -0,0 +1,49 @@
+from address_book import AddressBook
+from models import NAME_ERROR, PHONE_ERROR
+
+
+def test_import_csv_skips_blank_lines_and_reports_file_lines(tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text(
+        "\n"
+        "name,phones,birthday\n"
+        "Anna,0500000000,01.02.2000\n"
+        "\n"
+        " , ,\n"
+        "Bob1,0500000001,\n"
+        "Cy,123,\n",
+        encoding="utf-8",
+    )
+    book = AddressBook()
+    report = book.import_csv(str(path))
+    assert (report.added, report.updated) == (1, 0)
+    assert report.errors == [(6, NAME_ERROR), (7, PHONE_ERROR)]
+
+
+def test_import_jsonl_reports_file_lines(tmp_path):
+    path = tmp_path / "contacts.jsonl"
+    path.write_text(
+        '{"name": "Anna", "phones": ["0500000000"]}\n'
+        "\n"
+        '{"name": "Bob", "phones": ["123"]}\n'
+        "[1]\n",
+        encoding="utf-8",
+    )
+    book = AddressBook()
+    report = book.import_jsonl(str(path))
+    assert report.added == 1
+    assert report.errors == [(3, PHONE_ERROR), (4, "Expected a JSON object")]
+
+
+def test_non_ascii_digits_fail_only_their_row():
+    book = AddressBook()
+    report = book.add_many([("Anna", "0500000000", None), ("Bob", "012345678²", None)], chunk_size=1)
+    assert report.added == 1
+    assert report.errors == [(2, PHONE_ERROR)]
+
+
+def test_duplicate_numbers_in_a_row_are_stored_once():
+    book = AddressBook()
+    book.add_many([("Ann", "0501234567;050-123-45-67", None)])
+    book.add_many([("Ann", "0501234567;0670000000;067 000 00 00", None)])
+    assert str(book.find("Ann")) == "Contact name: Ann, phones: 0501234567; 0670000000"
@@ -0,0 +1,33 @@
+import pytest
+
+from models import (
+    NAME_ERROR, PHONE_ERROR, Phone, ValidationException, normalize_phone, phone_to_int, validate_names,
+)
+
+
+def test_normalize_phone():
+    assert normalize_phone("050 123-45-67") == "0501234567"
+    assert normalize_phone("+38 (050) 123-45-67") == "0501234567"
+    assert normalize_phone("0038050.123.45.67") == "0501234567"
+    assert normalize_phone("380501234567") == "0501234567"
+    assert normalize_phone("12345") == "12345"
+
+
+@pytest.mark.parametrize("value", ["012345678²", "٠١٢٣٤٥٦٧٨٩", "050123456", "05012345678", "050123456a", ""])
+def test_invalid_phones_are_rejected_without_raising(value):
+    assert phone_to_int(value) is None
+    assert Phone.normalize_many([value]) == [None]
+    with pytest.raises(ValidationException, match=PHONE_ERROR):
+        Phone(value)
+
+
+def test_valid_phones():
+    assert phone_to_int("+38 050 123 45 67") == 501234567
+    assert Phone.normalize_many(["0501234567", "bad", "0670000000"]) == [501234567, None, 670000000]
+    assert Phone("050-123-45-67").value == "0501234567"
+
+
+def test_validate_names():
+    mask, errors = validate_names(["Anna", "Bob1", "Zoë", ""])
+    assert list(mask) == [True, False, True, False]
+    assert errors == {1: NAME_ERROR, 3: NAME_ERROR}
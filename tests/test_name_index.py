@@ -0,0 +1,100 @@
+import random
+from bisect import bisect_left, insort
+
+from name_index import SortedKeyList, TrigramIndex, edit_distance
+
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def random_names(rng, count, longest):
+    return {
+        "".join(rng.choice("abcde") for _ in range(rng.randint(1, longest)))
+        for _ in range(count)
+    }
+
+
+def test_edit_distance_matches_levenshtein():
+    rng = random.Random(1)
+    words = sorted(random_names(rng, 300, 12))
+    for query in words[:40]:
+        distance = edit_distance(query)
+        for word in words:
+            assert distance(word) == levenshtein(query, word)
+
+
+def test_fuzzy_search_finds_short_names_without_shared_trigrams():
+    index = TrigramIndex(["jo", "anna"])
+    assert index.search("bo") == [(1, "jo")]
+
+
+def test_fuzzy_search_matches_brute_force():
+    rng = random.Random(2)
+    keys = random_names(rng, 800, 8)
+    index = TrigramIndex(keys)
+    removed = set(rng.sample(sorted(keys), 80))
+    for key in removed:
+        index.discard(key)
+    keys -= removed
+
+    for query in random_names(rng, 60, 8):
+        distances = [(levenshtein(query, key), key) for key in keys]
+        for max_distance in (1, 2):
+            expected = sorted(item for item in distances if item[0] <= max_distance)
+            assert index.search(query, max_distance) == expected, (query, max_distance)
+
+
+class SmallBuckets(SortedKeyList):
+    # Small enough that a few hundred keys split and empty many buckets.
+    LOAD = 4
+
+
+def check_against_list(keys, expected, rng):
+    assert list(keys) == expected
+    assert len(keys) == len(expected)
+    for index in range(-len(expected), len(expected)):
+        assert keys[index] == expected[index]
+    for probe in random_names(rng, 30, 4) | set(rng.sample(expected, min(10, len(expected)))):
+        assert keys.rank(probe) == bisect_left(expected, probe)
+        assert (probe in keys) == (probe in expected)
+        assert list(keys.prefixed(probe)) == [key for key in expected if key.startswith(probe)]
+    for _ in range(30):
+        start, stop = sorted(rng.randrange(len(expected) + 2) for _ in range(2))
+        assert list(keys.islice(start, stop)) == expected[start:stop]
+        low, high = sorted(rng.sample(expected, 2)) if len(expected) > 1 else (None, None)
+        first = 0 if low is None else bisect_left(expected, low)
+        last = len(expected) if high is None else bisect_left(expected, high)
+        assert list(keys.irange(low, high)) == expected[first:last]
+        assert list(keys.irange(low)) == expected[first:]
+
+
+def test_sorted_key_list_matches_bisect_on_a_list():
+    rng = random.Random(3)
+    initial = sorted(random_names(rng, 200, 5))
+    keys = SmallBuckets(initial)
+    expected = list(initial)
+    check_against_list(keys, expected, rng)
+
+    for _ in range(600):
+        key = "".join(rng.choice("abcde") for _ in range(rng.randint(1, 5)))
+        if key in expected:
+            keys.discard(key)
+            expected.remove(key)
+        else:
+            keys.add(key)
+            insort(expected, key)
+    keys.discard("missing")
+    check_against_list(keys, expected, rng)
+
+    for key in list(expected):
+        keys.discard(key)
+    assert len(keys) == 0 and list(keys.islice()) == []
+    keys.add("anna")
+    assert list(keys) == ["anna"] and keys.rank("b") == 1
@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+
+from rwlock import ReadWriteLock
+
+TIMEOUT = 5
+
+
+def run(target):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_both_sides_are_reentrant_and_the_writer_may_read():
+    lock = ReadWriteLock()
+    with lock.read(), lock.read():
+        pass
+    with lock.write(), lock.write(), lock.read(), lock.read():
+        pass
+    # Fully released: another thread can take the write lock.
+    taken = threading.Event()
+
+    def writer():
+        with lock.write():
+            taken.set()
+
+    run(writer).join(TIMEOUT)
+    assert taken.is_set()
+
+
+def test_reader_can_not_upgrade():
+    lock = ReadWriteLock()
+    with lock.read():
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+    # The failed upgrade left nothing behind.
+    with lock.write():
+        pass
+    assert lock._waiting_writers == 0 and not lock._readers
+
+
+def test_readers_share_and_writers_exclude():
+    lock = ReadWriteLock()
+    inside = threading.Barrier(2, timeout=TIMEOUT)
+
+    def reader():
+        with lock.read():
+            inside.wait()
+
+    # Two readers meet at the barrier only if neither blocks the other.
+    threads = [run(reader) for _ in range(2)]
+    for thread in threads:
+        thread.join(TIMEOUT)
+        assert not thread.is_alive()
+
+    events = []
+    writer_in = threading.Event()
+    release_writer = threading.Event()
+
+    def writer():
+        with lock.write():
+            writer_in.set()
+            release_writer.wait(TIMEOUT)
+            events.append("writer done")
+
+    def late_reader():
+        with lock.read():
+            events.append("reader in")
+
+    writing = run(writer)
+    assert writer_in.wait(TIMEOUT)
+    reading = run(late_reader)
+    reading.join(0.1)
+    assert reading.is_alive()
+    release_writer.set()
+    writing.join(TIMEOUT)
+    reading.join(TIMEOUT)
+    assert events == ["writer done", "reader in"]
+
+
+def test_waiting_writer_keeps_new_readers_out():
+    lock = ReadWriteLock()
+    events = []
+    lock.acquire_read()
+
+    def writer():
+        with lock.write():
+            events.append("writer")
+
+    def reader():
+        with lock.read():
+            events.append("reader")
+
+    writing = run(writer)
+    while not lock._waiting_writers:
+        writing.join(0.01)
+    reading = run(reader)
+    reading.join(0.1)
+    assert reading.is_alive()
+    lock.release_read()
+    writing.join(TIMEOUT)
+    reading.join(TIMEOUT)
+    assert events == ["writer", "reader"]
+
+
+def test_release_write_from_another_thread_fails():
+    lock = ReadWriteLock()
+    errors = []
+
+    def release():
+        try:
+            lock.release_write()
+        except RuntimeError as e:
+            errors.append(e)
+
+    with lock.write():
+        run(release).join(TIMEOUT)
+    assert len(errors) == 1
@@ -0,0 +1,41 @@
+import asyncio
+
+from server import STREAM_CHUNK_LINES, CommandServer
+from storage import Storage
+
+
+def name(index):
+    return "Name" + "".join("abcdefghij"[int(digit)] for digit in f"{index:04d}")
+
+
+async def exchange(server, commands):
+    listener = await asyncio.start_server(server.handle_client, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    async with listener:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write("".join(f"{command}\n" for command in commands).encode("utf-8"))
+        await writer.drain()
+        replies = (await reader.read()).decode("utf-8")
+        writer.close()
+        await writer.wait_closed()
+    return replies.split("\n\n")
+
+
+def test_replies_stream_in_order(tmp_path):
+    storage = Storage(str(tmp_path))
+    book = storage.load()
+    count = STREAM_CHUNK_LINES * 2 + 1
+    for index in range(count):
+        book.add_contact(name(index), f"{index:010d}")
+    server = CommandServer(book, storage)
+
+    replies = asyncio.run(exchange(server, [f"phone {name(1)}", "", "all --sorted --size 1000", "nope", "exit"]))
+    storage.close()
+
+    assert replies[0] == "0000000001"
+    assert replies[1] == "Please enter a command"
+    listed = replies[2].split("\n")
+    assert len(listed) == count
+    assert listed[0] == f"Contact name: {name(0)}, phones: 0000000000"
+    assert replies[3] == "Invalid command."
+    assert server.counts == {"ok": 3, "usage": 1}
@@ -0,0 +1,73 @@
+from datetime import date
+
+from models import Record
+from snapshot import SnapshotView, record_to_row, row_key, write_snapshot
+from storage import Storage
+
+ROWS = sorted(
+    [
+        ("Anna", [500000000, 500000001], date(1990, 2, 1).toordinal()),
+        ("bob", [], 0),
+        ("Cy", [500000001], date(2000, 2, 29).toordinal()),
+        ("Dora", [670000000], 0),
+    ],
+    key=row_key,
+)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, ROWS, seq=42)
+    view = SnapshotView(path)
+
+    assert view.count == len(ROWS)
+    assert view.seq == 42
+    assert [view.row(index) for index in range(view.count)] == ROWS
+    assert list(view.rows(skip={1})) == [ROWS[0]] + ROWS[2:]
+
+
+def test_lookups(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, ROWS, seq=1)
+    view = SnapshotView(path)
+
+    assert view.lookup("cy") == 2
+    assert view.lookup("eve") is None
+    assert view.phone_rows(500000001) == [0, 2]
+    assert view.phone_rows(123) == []
+    assert view.phone_rows(670000000) == [3]
+    assert view.phone_rows(500000000) == [0]
+    assert view.phone_rows(9999999999) == []
+    assert view.birthday_rows([(2, 29)]) == [2]
+
+
+def test_record_row_round_trip():
+    record = Record("Anna")
+    record.add_phone("0500000000")
+    record.add_birthday("01.02.1990")
+    assert record_to_row(record) == ("Anna", [500000000], date(1990, 2, 1).toordinal())
+
+
+def test_book_pulls_rows_lazily(tmp_path):
+    storage = Storage(str(tmp_path))
+    book = storage.load()
+    book.add_many([("Anna", "0500000000", "01.02.1990"), ("Bob", "0500000001", None), ("Cy", "0670000000", None)])
+    storage.compact()
+    storage.close()
+
+    storage = Storage(str(tmp_path))
+    book = storage.load()
+    assert book._base is not None and not book.data
+    assert len(book) == 3
+
+    assert str(book.find("ANNA")) == "Contact name: Anna, phones: 0500000000, birthday: 01.02.1990"
+    assert list(book.data) == ["anna"]
+
+    assert [record.name.value for record in book.find_by_phone("0670000000")] == ["Cy"]
+    assert sorted(book.data) == ["anna", "cy"]
+    assert book._base is not None
+
+    book.delete("bob")
+    assert len(book) == 2
+    assert "bob" not in book
+    storage.close()
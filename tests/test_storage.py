@@ -0,0 +1,141 @@
+import os
+import threading
+
+from models import Record
+from storage import SNAPSHOT_FILE, Storage
+
+
+def reload(directory):
+    storage = Storage(directory)
+    book = storage.load()
+    book._load_all()
+    contents = {key: str(record) for key, record in book.data.items()}
+    storage.close()
+    return contents
+
+
+def contents(book):
+    book._load_all()
+    return {key: str(record) for key, record in book.data.items()}
+
+
+def test_journal_replay(tmp_path):
+    storage = Storage(str(tmp_path))
+    book = storage.load()
+    book.add_contact("Anna", "0500000000")
+    book.add_contact("Bob", "0500000001")
+    book.find("Anna").add_birthday("01.02.2000")
+    book.change_contact("Bob", "0500000001", "0500000002")
+    book.find("Anna").remove_phone("0500000000")
+    book.delete("Bob")
+    book.add_contact("Cy", "0500000003")
+    expected = contents(book)
+    storage.close()
+
+    assert not os.path.exists(tmp_path / SNAPSHOT_FILE)
+    assert reload(str(tmp_path)) == expected
+
+
+def test_journal_replays_birthdays_before_year_1000(tmp_path):
+    storage = Storage(str(tmp_path))
+    book = storage.load()
+    book.add_contact("Anna", "0500000000")
+    book.find("Anna").add_birthday("01.01.0999")
+    record = Record("Bob")
+    record.add_birthday("02.03.0042")
+    book.add_record(record)
+    expected = contents(book)
+    storage.close()
+
+    assert reload(str(tmp_path)) == expected
+    assert expected["anna"].endswith("birthday: 01.01.0999")
+
+
+def test_torn_journal_tail_is_ignored(tmp_path):
+    storage = Storage(str(tmp_path))
+    book = storage.load()
+    book.add_contact("Anna", "0500000000")
+    expected = contents(book)
+    journal = storage._journal.name
+    storage.close()
+    with open(journal, "a", encoding="utf-8") as file:
+        file.write('[99, "put", "Bo')
+
+    assert reload(str(tmp_path)) == expected
+
+
+def test_compaction_writes_snapshot_and_drops_old_journals(tmp_path):
+    storage = Storage(str(tmp_path), compact_threshold=10)
+    book = storage.load()
+    for index in range(30):
+        book.add_contact("N" + "abcdefghij"[index % 10] * (1 + index // 10), f"{index:010d}")
+        storage.flush()
+    book.delete("Na")
+    expected = contents(book)
+    storage.close()
+
+    assert os.path.exists(tmp_path / SNAPSHOT_FILE)
+    assert len([name for name in os.listdir(tmp_path) if name.startswith("journal-")]) <= 1
+    assert reload(str(tmp_path)) == expected
+
+
+def test_compaction_waits_for_a_replace_to_finish(tmp_path):
+    # Replacing a record journals "delete" then "put"; a snapshot taken
+    # between the two would resurrect the old record's phones on replay.
+    storage = Storage(str(tmp_path), compact_threshold=3)
+    book = storage.load()
+    book.add_contact("Anna", "0500000000")
+    book.add_record(Record("Anna"))
+    storage.flush()
+    expected = contents(book)
+    storage.close()
+
+    assert os.path.exists(tmp_path / SNAPSHOT_FILE)
+    assert reload(str(tmp_path)) == expected
+    assert expected["anna"] == "Contact name: Anna, phones: "
+
+
+def test_changes_after_compaction_are_replayed(tmp_path):
+    storage = Storage(str(tmp_path), compact_threshold=2)
+    book = storage.load()
+    book.add_contact("Anna", "0500000000")
+    book.add_contact("Bob", "0500000001")
+    storage.flush()
+    storage.close()
+
+    storage = Storage(str(tmp_path), compact_threshold=2)
+    book = storage.load()
+    book.add_contact("Anna", "0500000002")
+    book.delete("Bob")
+    expected = contents(book)
+    storage.close()
+
+    assert reload(str(tmp_path)) == expected
+
+
+def test_concurrent_checkpoints_start_one_compactor(tmp_path):
+    storage = Storage(str(tmp_path))
+    storage.load()
+    started = []
+    running = threading.Event()
+
+    def write_snapshot(book):
+        started.append(book)
+        running.wait(5)
+
+    storage._write_snapshot = write_snapshot
+    storage._compact_due = True
+    barrier = threading.Barrier(8)
+
+    def checkpoint():
+        barrier.wait()
+        storage.checkpoint()
+
+    threads = [threading.Thread(target=checkpoint) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    running.set()
+    storage.close()
+    assert len(started) == 1